@@ -0,0 +1,157 @@
+import os
+import struct
+import threading
+import warnings
+import zipfile
+import zlib
+
+# Fixed metadata so the same images always produce the same bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_CREATE_SYSTEM = 3  # unix
+ZIP_FILE_MODE = 0o644 << 16
+
+LOCAL_HEADER = struct.Struct("<4s5H3I2H")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def _zip_info(name: str, compress_type: int) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    info.compress_type = compress_type
+    info.create_system = ZIP_CREATE_SYSTEM
+    info.external_attr = ZIP_FILE_MODE
+    return info
+
+
+def _recovered_entries(path: str):
+    """Yield (name, data) for every complete entry of a zip that lost its central directory"""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(LOCAL_HEADER.size)
+            if len(header) < LOCAL_HEADER.size:
+                return
+            signature, _, flags, method, _, _, crc, compressed_size, _, name_len, extra_len = LOCAL_HEADER.unpack(header)
+            # An entry cut off mid-write still has the zeroed sizes zipfile
+            # writes before seeking back, so an empty entry ends the salvage
+            if signature != LOCAL_HEADER_SIGNATURE or flags & DATA_DESCRIPTOR_FLAG or compressed_size == 0:
+                return
+            name = f.read(name_len).decode("utf-8")
+            f.seek(extra_len, os.SEEK_CUR)
+            data = f.read(compressed_size)
+            if len(data) < compressed_size:
+                return
+            try:
+                if method == zipfile.ZIP_DEFLATED:
+                    data = zlib.decompress(data, -zlib.MAX_WBITS)
+                elif method != zipfile.ZIP_STORED:
+                    return
+            except zlib.error:
+                return
+            if zlib.crc32(data) != crc:
+                return
+            yield name, data
+
+
+class ArchiveWriter:
+    """Streams rendered images into a zip instead of a folder.
+
+    Entries are written with fixed timestamps and attributes, so rendering
+    the same cards in the same order gives a byte-identical archive. While
+    a run is going the zip lives at `<path>.partial`; if the run dies the
+    complete entries are salvaged on the next start and rendering resumes
+    from there. Images that are rewritten or discarded are dropped when the
+    archive is closed.
+    """
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.partial_path = path + ".partial"
+        self.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        self.lock = threading.Lock()  # variants of a card may be saved from several threads
+
+        if os.path.exists(self.partial_path):
+            self._salvage_partial()
+        elif os.path.exists(path):
+            os.replace(path, self.partial_path)
+
+        mode = "a" if os.path.exists(self.partial_path) else "w"
+        self.zip = zipfile.ZipFile(self.partial_path, mode, self.compress_type)
+        existing = self.zip.namelist()
+        self.written = set(existing)
+        self.names = set(existing)
+        self.needs_compact = len(existing) != len(self.written)
+
+    def _salvage_partial(self):
+        try:
+            with zipfile.ZipFile(self.partial_path):
+                return
+        except (zipfile.BadZipFile, OSError, EOFError):
+            pass
+
+        salvaged_path = self.partial_path + ".salvage"
+        count = 0
+        with zipfile.ZipFile(salvaged_path, "w", self.compress_type) as out:
+            for name, data in _recovered_entries(self.partial_path):
+                out.writestr(_zip_info(name, self.compress_type), data)
+                count += 1
+        os.replace(salvaged_path, self.partial_path)
+        print(f"♻️  Recovered {count} images from interrupted archive {self.partial_path}")
+
+    def member_path(self, name: str) -> str:
+        """Path-like key used to record an archive entry in the build manifest"""
+        return os.path.join(self.path, name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def write(self, name: str, data: bytes):
+        with self.lock:
+            if name in self.written:
+                # Zips can't overwrite in place, the old copy goes at close
+                self.needs_compact = True
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)  # duplicate name
+                self.zip.writestr(_zip_info(name, self.compress_type), data)
+            self.written.add(name)
+            self.names.add(name)
+
+    def read(self, name: str) -> bytes:
+        """Newest copy of an entry written so far"""
+        with self.lock:
+            if name not in self.names:
+                raise KeyError(name)
+            return self.zip.read(name)
+
+    def discard(self, name: str) -> bool:
+        with self.lock:
+            if name not in self.names:
+                return False
+            self.names.discard(name)
+            self.needs_compact = True
+            return True
+
+    def close(self):
+        self.zip.close()
+        if self.needs_compact:
+            self._compact()
+        os.replace(self.partial_path, self.path)
+
+    def _compact(self):
+        """Keep only the newest copy of each live entry, in first-written order"""
+        compact_path = self.partial_path + ".compact"
+        with zipfile.ZipFile(self.partial_path) as src, zipfile.ZipFile(compact_path, "w", self.compress_type) as out:
+            latest = {}
+            for info in src.infolist():
+                latest[info.filename] = info
+            for name, info in latest.items():
+                if name in self.names:
+                    out.writestr(_zip_info(name, self.compress_type), src.read(info))
+        os.replace(compact_path, self.partial_path)
+        self.written = set(self.names)
+        self.needs_compact = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
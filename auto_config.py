@@ -1,13 +1,15 @@
-import requests
-from io import BytesIO
-from PIL import Image
-import pillow_avif
-import json5 as json
-import easyocr
 import numpy as np
-import cv2
+from PIL import Image
+from decode_cache import DecodeCache, decode_image
+from ocr_service import ocr_engine
+from rarity import detect_rarities, rarity_band
+from scan_journal import ScanJournal
+from tracing import span
 
 JSON_DUMP_FILE = "scraped_cards_tester.json5"
+JOURNAL_FILE = "scraped_cards_tester.json5.journal.jsonl"  # results of an unfinished scan
+CACHE_DECODED = False  # keep decoded art in .decode_cache (about 9 MB per card), shared with main.py
+DECODED = DecodeCache() if CACHE_DECODED else None
 
 # Simple Card class
 class Card:
@@ -17,12 +19,16 @@ class Card:
     
     def download_image(self) -> Image.Image | None:
         """Download card image from the website"""
+        import requests
+
         url = f"https://cdn.rgpub.io/public/live/map/riftbound/latest/OGN/cards/{self.id}/full-desktop-2x.avif"
         try:
-            response = requests.get(url, timeout=10)
+            with span("download", card=self.id):
+                response = requests.get(url, timeout=10)
             if response.status_code == 200:
                 print(f"✔ Downloaded: {self.id}")
-                return Image.open(BytesIO(response.content)).convert("RGB")
+                with span("decode", card=self.id):
+                    return decode_image(response.content, DECODED)
             else:
                 print(f"✘ Not found: {self.id} (HTTP {response.status_code})")
         except Exception as e:
@@ -30,38 +36,13 @@ class Card:
         return None
     
     def detect_rarity(self, image: Image.Image) -> str:
-        """Detect rarity by analyzing the bottom section of the card"""
-        # Much smaller, more focused crop
-        width, height = image.size
-        left_crop = int(width * 0.49)     # More centered
-        right_crop = int(width * 0.51)    # Smaller width  
-        top_crop = int(height * 0.935)     # Lower down
-        bottom_crop = int(height * 0.95) # Very thin slice
-        
-        rarity_crop = image.crop((left_crop, top_crop, right_crop, bottom_crop))
-
-        rgb_array = np.array(rarity_crop)
-        # Get average RGB values
-        avg_rgb = np.mean(rgb_array, axis=(0,1))  # Average across height and width
-        
-        if avg_rgb[2] < 85:
-            detected_rarity = "epic"
-        elif avg_rgb[1] < 115:
-            detected_rarity = "rare"
-        elif avg_rgb[0] < 135:
-            detected_rarity = "uncommon"
-        else:
-            detected_rarity = "common"
-
-        return detected_rarity
+        """Detect rarity from the gem at the bottom of the card, see rarity.py"""
+        return detect_rarities([rarity_band(image)])[0]
     
     def extract_text(self, image: Image.Image) -> str:
-        """Extract text from card image using OCR on multiple sections"""
-        reader = easyocr.Reader(['en'], gpu=True)
-        tap_template_white = cv2.imread('assets/white_on_black_auto.png', cv2.IMREAD_GRAYSCALE)
-        tap_template_black = cv2.imread('assets/black_on_white_auto.png', cv2.IMREAD_GRAYSCALE)
-        if tap_template_white is None:
-            raise FileNotFoundError("WHERE IS TAPPING ICONS")
+        """Extract text from card image using OCR on multiple sections. Raises when the OCR fails"""
+        # The OCR service when it's running, otherwise easyocr loaded once in this process
+        ocr = ocr_engine()
         
         try:
             width, height = image.size
@@ -74,7 +55,8 @@ class Card:
             legend_section = image.crop((0, top, width_legend_token, bottom))
             
             legend_array = np.array(legend_section)
-            results = reader.readtext(legend_array)
+            with span("ocr.readtext", card=self.id, section="legend"):
+                results = ocr.readtext([legend_array], ["probe"])[0]
 
             section_text = []
             for (bbox, text, confidence) in results:
@@ -89,14 +71,17 @@ class Card:
                     (0.64, 0.69),    # 30-50% from top
                     (0.78, 0.93),    # 50-80% from top
                 ]
+                regions = ["legend_type", "legend_rules"]  # line boxes to read, see ocr_service.py
             else:
                 # Define sections to process
                 sections = [
                     (0.5, 0.56),    # 30-50% from top
                     (0.67, 0.86),    # 50-80% from top
                 ]
+                regions = ["type", "rules"]
 
             section_texts = []
+            section_arrays = []
             
             for i, (top_pct, bottom_pct) in enumerate(sections):
                 # Crop the section
@@ -107,32 +92,21 @@ class Card:
                 # Save the cropped section
                 # section.save(f"section_{self.id}_{i}.png")
                 # print(f"  Saved section {i}: section_{self.id}_{i}.png")
-                
-                # Run OCR on this section
-                image_array = np.array(section)
-                results = reader.readtext(image_array)
-                
+                section_arrays.append(np.array(section))
+            
+            # Run OCR on both sections in one batch
+            with span("ocr.readtext", card=self.id, section="all"):
+                section_results = ocr.readtext(section_arrays, regions)
+            
+            for i, results in enumerate(section_results):
                 section_text = []
                 for (bbox, text, confidence) in results:
                     if confidence > 0.5:  # Only confident detections
                         section_text.append(text)
                 # print(i)
                 if i == 1:
-                    # Convert section to grayscale for template matching
-                    section_gray = cv2.cvtColor(np.array(section), cv2.COLOR_RGB2GRAY)
-                    
-                    # Perform template matching
-                    result = cv2.matchTemplate(section_gray, tap_template_white, cv2.TM_CCOEFF_NORMED)
-                    result2 = cv2.matchTemplate(section_gray, tap_template_black, cv2.TM_CCOEFF_NORMED)
-                    
-                    # Set threshold for match confidence
-                    threshold = 0.8
-                    # print(result.max())
-                    # print(result2.max())
-                    locations = np.where(result >= threshold)
-                    locations2 = np.where(result2 >= threshold)
-                    
-                    if len(locations[0]) > 0 or len(locations2[0]) > 0:  # If we found matches
+                    # Template match the tap icons, white on black and black on white
+                    if ocr.find_tap([section_arrays[i]])[0]:
                         section_text.append("tap")
 
                 # Add to results (empty string if no text found)
@@ -145,8 +119,8 @@ class Card:
             return section_texts  # Always returns exactly 2 strings
             
         except Exception as e:
-            print(f"OCR Error: {e}")
-            return ["", ""]
+            # Empty text would be saved as a card without keywords, so the scan skips the card instead
+            raise RuntimeError(f"OCR Error: {e}") from e
         
     def extract_keywords(self, text: str) -> list:
         """Extract keywords from the card text"""
@@ -201,91 +175,86 @@ class Card:
         
         return list(set(keywords))  # Remove duplicates
 
-# Main scraping function
-def scrape_cards():
-    """Scrape cards and extract text"""
-    results = []
-    results_data = []
-    lst_cards = [1, 2, 40, 44, 53, 273, 4, 66, 78, 77, 89, 247, 248, 275]
-    lst_cards = [248]
-    lst_cards.sort()
+def scan_card(card: Card) -> dict | None:
+    """Download and scan one card, None if it couldn't be downloaded"""
+    image = card.download_image()
+    if image is None:
+        return None
 
-    # for i in lst_cards:
-    for i in range(1, 299):
-        card = Card(i)
-        
-        # Download image
-        image = card.download_image()
-        if image is None:
-            continue
+    if card.card_num >= 275 and card.card_num <= 298:
+        return {
+            "id": card.id,
+            "keywords": ["location"],
+            "rarity": "uncommon"
+        }
 
-        if i >= 275 and i <= 298:
-            result = {
-                "id": card.id,
-                "keywords": ["location"],
-                "rarity": "uncommon"
-            }
-            results.append(result)
-            continue
-        
-        # Extract text
-        text = card.extract_text(image)
+    # Extract text
+    text = card.extract_text(image)
 
-        # Extract keywords from text
-        keywords = card.extract_keywords(text)
+    # Extract keywords from text
+    keywords = card.extract_keywords(text)
 
-        result = {
-            "id": card.id,
-            "text": text,
-        }
-        results_data.append(result)
-        
-        # Detect rarity
-        rarity = card.detect_rarity(image)
-        
-        # Store result
-        result = {
-            "id": card.id,
-            "keywords": keywords,
-            "rarity": rarity
-        }
-        results.append(result)
-        
-        # print(f"Card {card.id} [{rarity}]: {text[:100]}...")  # Show first 100 chars
-    # with open("scraped_cards_data.json5", "w") as f:
-    #     json.dump(results_data, f, indent=4)
-    # Save results
-    # Load existing data if file exists
-    try:
-        with open(JSON_DUMP_FILE, "r") as f:
-            existing_data = json.load(f)
-    except FileNotFoundError:
-        existing_data = []
+    # Detect rarity
+    rarity = card.detect_rarity(image)
 
-    # Convert to dict for easier lookup by ID
-    existing_dict = {item["id"]: item for item in existing_data}
+    # print(f"Card {card.id} [{rarity}]: {text[:100]}...")  # Show first 100 chars
+    return {
+        "id": card.id,
+        "keywords": keywords,
+        "rarity": rarity
+    }
 
-    # Update with new results
-    for result in results:
-        existing_dict[result["id"]] = result  # This will add new or overwrite existing
 
-    # Convert back to list and save
-    updated_data = list(existing_dict.values())
+# Main scraping function
+def scrape_cards(card_nums=None, resume=True):
+    """Scrape cards and extract text, all of them unless card_nums is given.
 
-    # Sort the data
-    def sort_config(config):
-        def card_sort_key(entry):
-            # Extract numeric part from "OGN-001" -> 1
-            return int(entry["id"].split("-")[1])
-        
-        return sorted(config, key=card_sort_key)
+    Each result is journaled as soon as the card is done (see scan_journal.py),
+    so an interrupted full scan resumes where it stopped unless resume is False.
+    Scanning given cards always scans them all. It adds to the journal of an
+    interrupted full scan without resuming or ending it.
+    """
+    journal = ScanJournal(JOURNAL_FILE, JSON_DUMP_FILE)
+    full_scan = card_nums is None
+    # Some cards scanned while a full scan is interrupted leave its journal in place
+    keep_journal = not full_scan and journal.exists()
+    done = {}
+    if full_scan:
+        card_nums = range(1, 299)
+        done = journal.load() if resume else journal.reset()
+        if done:
+            print(f"⏩ Resuming: {len(done)} cards already scanned in {JOURNAL_FILE}")
 
-    sorted_data = sort_config(updated_data)
+    ocr_engine()  # loads the OCR model now, so a missing one stops the scan before any card
+    scanned = 0
+    try:
+        for i in card_nums:
+            card = Card(i)
+            if card.id in done:
+                continue
+            try:
+                result = scan_card(card)
+            except Exception as e:
+                print(f"✘ Error scanning {card.id}: {e}")
+                continue
+            if result is not None:
+                journal.append(result)
+                scanned += 1
+    except KeyboardInterrupt:
+        if full_scan:
+            journal.compact()
+            print(f"⏸️  Scan stopped after {scanned} cards, saved to {JSON_DUMP_FILE}. Run it again to resume")
+            return
+        print(f"⏸️  Scan stopped after {scanned} cards")
 
-    with open(JSON_DUMP_FILE, "w") as f:
-        json.dump(sorted_data, f, indent=4)
+    if keep_journal:
+        journal.compact()
+    else:
+        journal.finish()
+    if DECODED is not None:
+        DECODED.trim()
 
-    print(f"Updated {JSON_DUMP_FILE} with {len(results)} cards")
+    print(f"Updated {JSON_DUMP_FILE} with {scanned} cards")
 
 if __name__ == "__main__":
     scrape_cards()
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""Rendering micro-benchmarks with JSON baselines.
+
+Everything runs on a synthesized card image, no network needed.
+
+    python benchmarks/bench_render.py run [--repeats N] [--save NAME]
+    python benchmarks/bench_render.py compare BASELINE [CURRENT] [--threshold 0.10]
+
+`run --save NAME` writes benchmarks/baselines/NAME.json. `compare` checks a
+fresh run (or a second saved file) against a baseline and exits non-zero
+if any case got slower than the threshold allows.
+
+Peak allocation comes from tracemalloc, so it counts Python and numpy
+memory but not pixel buffers Pillow allocates in C.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+import PIL
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+SOURCE_SIZE = (1488, 2079)
+
+
+def variant_names() -> list[str]:
+    from main import Card
+
+    return sorted(name[len("_create_"):-len("_variant")] for name in dir(Card) if name.startswith("_create_") and name.endswith("_variant"))
+
+
+def cases():
+    """(name, setup, fn) triples. setup() builds the argument and is not timed.
+
+    Setups hand out a fresh copy each time, so a card's cached darkened layer
+    (Card._layer) is never reused between repeats.
+    """
+    # Imported here so bench_startup.py can share the baseline helpers without loading the renderer
+    from main import Card
+    from bench_resize import synth_card
+
+    source = synth_card(*SOURCE_SIZE)
+    card = Card("OGN-001", ["unit", "accelerate"], "rare")
+    legend = Card("OGN-002", ["legend", "hidden"], "rare")
+    canvas = card.resize_and_pad(source)
+    modified = card.apply_modifications(canvas.copy())
+    darkened = card._darken_image(modified)
+    icon = '<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2"><path d="m9 18 6-6-6-6"/></svg>'
+
+    yield "resize_and_pad", lambda: source, card.resize_and_pad
+    yield "apply_modifications", canvas.copy, card.apply_modifications
+    for variant in variant_names():
+        yield f"variant.{variant}", modified.copy, getattr(card, f"_create_{variant}_variant")
+    yield "variant.hidden[legend]", modified.copy, legend._create_hidden_variant
+    yield "variants.all", modified.copy, lambda img: [getattr(card, f"_create_{variant}_variant")(img) for variant in variant_names()]
+    yield "_add_svg_overlay", darkened.copy, lambda img: card._add_svg_overlay(img, icon)
+    yield "_add_two_svg_overlay", darkened.copy, lambda img: card._add_two_svg_overlay(img, icon, icon, True)
+    yield "_darken_half_image", modified.copy, card._darken_half_image
+    yield "png_save", lambda: modified, lambda img: img.save(BytesIO(), format="PNG")
+
+
+def measure(setup, fn, repeats: int) -> dict:
+    fn(setup())  # warm up caches and lazy imports
+    samples = []
+    for _ in range(repeats):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    # One extra traced call, tracemalloc would skew the timings
+    arg = setup()
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    p95_index = min(len(samples) - 1, round(0.95 * (len(samples) - 1)))
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(samples[p95_index], 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(repeats: int, only: str | None = None) -> dict:
+    results = {}
+    for name, setup, fn in cases():
+        if only and only not in name:
+            continue
+        results[name] = measure(setup, fn, repeats)
+        r = results[name]
+        print(f"{name:28} mean {r['mean_ms']:8.2f} ms   p95 {r['p95_ms']:8.2f} ms   peak {r['peak_kib']:9.1f} KiB")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "machine": platform.machine(),
+            "repeats": repeats,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def baseline_path(name: str) -> str:
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save(report: dict, name: str):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"💾 Saved baseline to {path}")
+
+
+def load(name: str) -> dict:
+    with open(baseline_path(name), "r") as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str = "mean_ms") -> list[str]:
+    """Print a comparison table and return the cases that regressed"""
+    regressions = []
+    for name, base in sorted(baseline["results"].items()):
+        now = current["results"].get(name)
+        if now is None:
+            print(f"{name:28} missing from current run")
+            continue
+        ratio = now[metric] / base[metric] if base[metric] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  ⚠️ REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:28} {base[metric]:8.2f} -> {now[metric]:8.2f} ms  ({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendering micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--repeats", type=int, default=20)
+    run_parser.add_argument("--only", help="only run cases whose name contains this")
+    run_parser.add_argument("--save", metavar="NAME", help="save results as a baseline")
+
+    compare_parser = sub.add_parser("compare", help="compare against a saved baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", help="saved results to compare, default is a fresh run")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    compare_parser.add_argument("--metric", choices=["mean_ms", "p95_ms", "peak_kib"], default="mean_ms")
+    compare_parser.add_argument("--repeats", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        report = run(args.repeats, args.only)
+        if args.save:
+            save(report, args.save)
+        return
+
+    baseline = load(args.baseline)
+    current = load(args.current) if args.current else run(args.repeats)
+    print()
+    regressions = compare(baseline, current, args.threshold, args.metric)
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
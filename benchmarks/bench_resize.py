@@ -0,0 +1,71 @@
+"""Microbenchmark: Card.resize_and_pad against the original direct LANCZOS version.
+
+Runs on a synthesized card-sized image, no network needed:
+    python benchmarks/bench_resize.py [width height] [repeats]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import Card
+
+
+def legacy_resize_and_pad(img: Image.Image) -> Image.Image:
+    """resize_and_pad as it was before the reduce-then-resample path"""
+    orig_w, orig_h = img.size
+    scale = 1024 / orig_h
+    new_w = int(orig_w * scale)
+    resized = img.resize((new_w, 1024), Image.LANCZOS)
+
+    canvas = Image.new("RGB", (1024, 1024), (0, 0, 0))
+    offset = (1024 - new_w) // 2
+    canvas.paste(resized, (offset, 0))
+    return canvas
+
+
+def synth_card(width: int, height: int) -> Image.Image:
+    """Smooth colour fields plus grain, roughly like card art"""
+    rng = np.random.default_rng(0)
+    coarse = (rng.random((height // 16, width // 16, 3)) * 255).astype(np.uint8)
+    base = np.asarray(Image.fromarray(coarse).resize((width, height), Image.BICUBIC), dtype=np.float32)
+    grain = rng.normal(0, 10, base.shape)
+    return Image.fromarray(np.clip(base + grain, 0, 255).astype(np.uint8))
+
+
+def time_it(fn, img, repeats: int) -> float:
+    fn(img)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(img)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def psnr(a: Image.Image, b: Image.Image) -> float:
+    diff = np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)
+    mse = np.mean(diff * diff)
+    return float("inf") if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+
+def main():
+    width, height = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) >= 3 else (1488, 2079)
+    repeats = int(sys.argv[3]) if len(sys.argv) >= 4 else 20
+
+    img = synth_card(width, height)
+    card = Card("OGN-001", ["unit"])
+
+    legacy_ms = time_it(legacy_resize_and_pad, img, repeats)
+    new_ms = time_it(card.resize_and_pad, img, repeats)
+    quality = psnr(legacy_resize_and_pad(img), card.resize_and_pad(img))
+
+    print(f"Source {width}x{height}, {repeats} runs")
+    print(f"  legacy:  {legacy_ms:7.2f} ms")
+    print(f"  current: {new_ms:7.2f} ms  ({legacy_ms / new_ms:.2f}x)")
+    print(f"  PSNR vs legacy: {quality:.1f} dB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Startup time of every entry point, in a fresh interpreter each time.
+
+Each sample runs `python -c "import MODULE"` from the repo root, so it
+measures what a command pays before doing any work: imports and anything
+the modules do at import time. A module that imports one of HEAVY_MODULES
+up front, or creates files when imported, fails the run.
+
+    python benchmarks/bench_startup.py run [--repeats N] [--save NAME]
+    python benchmarks/bench_startup.py compare BASELINE [CURRENT] [--threshold 0.10]
+
+Baselines share the format and folder of bench_render.py.
+"""
+import argparse
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_render import compare, load, save
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ("main", "main_ogs", "auto_config", "auto_config_ogs", "manual_config", "json_comparer", "cli")
+# Only the stages that use these may import them
+HEAVY_MODULES = ("torch", "easyocr", "cv2", "cairosvg", "cairocffi", "requests", "pillow_avif")
+
+PROBE = """
+import os, sys, time
+before = set(os.listdir("."))
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+created = sorted(set(os.listdir(".")) - before - {{"__pycache__"}})
+print(elapsed * 1000, ",".join(heavy), ",".join(created))
+"""
+
+
+def probe(module: str) -> tuple[float, float, list[str], list[str]]:
+    """(import ms, whole process ms, heavy modules loaded, files created) of one cold import"""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                         cwd=REPO_DIR, capture_output=True, text=True)
+    total_ms = (time.perf_counter() - start) * 1000
+    if out.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{out.stderr.strip()}")
+    import_ms, heavy, created = (out.stdout.strip().splitlines()[-1].split(" ") + ["", ""])[:3]
+    return float(import_ms), total_ms, [name for name in heavy.split(",") if name], [name for name in created.split(",") if name]
+
+
+def measure(module: str, repeats: int) -> tuple[dict, list[str]]:
+    imports, totals, problems = [], [], set()
+    for i in range(repeats + 1):  # the first run warms up the bytecode cache and isn't timed
+        import_ms, total_ms, heavy, created = probe(module)
+        problems.update(f"imports {name}" for name in heavy)
+        problems.update(f"creates {name}" for name in created)
+        if i:
+            imports.append(import_ms)
+            totals.append(total_ms)
+
+    imports.sort()
+    p95_index = min(len(imports) - 1, round(0.95 * (len(imports) - 1)))
+    return {
+        "mean_ms": round(statistics.fmean(imports), 3),
+        "p95_ms": round(imports[p95_index], 3),
+        "process_ms": round(statistics.fmean(totals), 3),
+    }, sorted(problems)
+
+
+def run(repeats: int, only: str | None = None) -> tuple[dict, dict]:
+    results, problems = {}, {}
+    for module in ENTRY_POINTS:
+        if only and only not in module:
+            continue
+        try:
+            results[module], found = measure(module, repeats)
+        except RuntimeError as e:
+            problems[module] = [str(e)]
+            print(f"{module:28} ✘ {e}")
+            continue
+        if found:
+            problems[module] = found
+        r = results[module]
+        flag = f"  ⚠️ {', '.join(found)}" if found else ""
+        print(f"{module:28} import {r['mean_ms']:8.2f} ms   p95 {r['p95_ms']:8.2f} ms   process {r['process_ms']:8.2f} ms{flag}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeats": repeats,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point startup benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--repeats", type=int, default=10)
+    run_parser.add_argument("--only", help="only run entry points whose name contains this")
+    run_parser.add_argument("--save", metavar="NAME", help="save results as a baseline")
+
+    compare_parser = sub.add_parser("compare", help="compare against a saved baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", help="saved results to compare, default is a fresh run")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    compare_parser.add_argument("--metric", choices=["mean_ms", "p95_ms", "process_ms"], default="mean_ms")
+    compare_parser.add_argument("--repeats", type=int, default=10)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        report, problems = run(args.repeats, args.only)
+        if args.save:
+            save(report, args.save)
+        if problems:
+            sys.exit(f"\n⚠️  Entry points with import-time side effects: {', '.join(problems)}")
+        return
+
+    baseline = load(args.baseline)
+    if args.current:
+        current, problems = load(args.current), {}
+    else:
+        current, problems = run(args.repeats)
+    print()
+    regressions = compare(baseline, current, args.threshold, args.metric)
+    if regressions or problems:
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        if problems:
+            print(f"⚠️  Entry points with import-time side effects: {', '.join(problems)}")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
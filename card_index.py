@@ -0,0 +1,100 @@
+from collections import defaultdict
+
+from manifest import hash_entry
+
+
+def card_number(card_id: str) -> int:
+    # "OGN-001" -> 1
+    return int(card_id.split("-")[1])
+
+
+def normalize_card_id(card_id: str) -> str:
+    """"ogn-1" -> "OGN-001", padded the way card IDs are stored"""
+    set_key, _, number = card_id.strip().partition("-")
+    if not set_key.isalpha() or not number.isdigit():
+        raise ValueError(f"Not a card ID: {card_id}")
+    return f"{set_key.upper()}-{int(number):03d}"
+
+
+def parse_id_spec(spec: str) -> tuple[set[int], set[str]]:
+    """Parse "1-20,150,OGS-007" into card numbers and full card IDs, ValueError if malformed"""
+    numbers = set()
+    card_ids = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part[0].isalpha():
+            card_ids.add(normalize_card_id(part))
+            continue
+        start, dash, end = part.partition("-")
+        if not start.isdigit() or (dash and not end.isdigit()):
+            raise ValueError(f"Not a card number or range: {part}")
+        if not dash:
+            numbers.add(int(start))
+        elif int(start) > int(end):
+            raise ValueError(f"Empty range: {part}")
+        else:
+            numbers.update(range(int(start), int(end) + 1))
+    return numbers, card_ids
+
+
+class CardIndex:
+    """In-memory index over catalog entries for selection queries.
+
+    Each filter narrows the result, repeated values within one filter
+    widen it (any keyword of the list matches). Entries come back in
+    catalog order.
+    """
+
+    def __init__(self, entries: list[dict]):
+        self.entries = list(entries)
+        self.by_id = {}
+        self.by_set = defaultdict(set)
+        self.by_number = defaultdict(set)
+        self.by_keyword = defaultdict(set)
+        self.by_rarity = defaultdict(set)
+
+        for pos, entry in enumerate(self.entries):
+            card_id = entry["id"]
+            set_key = card_id.split("-")[0]
+            self.by_id.setdefault(card_id, set()).add(pos)
+            self.by_set[set_key].add(pos)
+            self.by_number[card_number(card_id)].add(pos)
+            for keyword in entry.get("keywords", []):
+                self.by_keyword[keyword].add(pos)
+            self.by_rarity[entry.get("rarity", "common")].add(pos)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def sets(self) -> list[str]:
+        return sorted(self.by_set)
+
+    def get(self, card_id: str) -> dict | None:
+        positions = self.by_id.get(card_id)
+        return self.entries[min(positions)] if positions else None
+
+    def select(self, sets=None, id_spec: str | None = None, keywords=None, rarities=None, changed_since: dict | None = None) -> list[dict]:
+        matches = set(range(len(self.entries)))
+
+        if sets:
+            matches &= set().union(*(self.by_set.get(s.upper(), set()) for s in sets))
+        if id_spec:
+            numbers, card_ids = parse_id_spec(id_spec)
+            by_spec = set().union(set(), *(self.by_number.get(n, set()) for n in numbers), *(self.by_id.get(c, set()) for c in card_ids))
+            matches &= by_spec
+        if keywords:
+            matches &= set().union(*(self.by_keyword.get(k, set()) for k in keywords))
+        if rarities:
+            matches &= set().union(*(self.by_rarity.get(r, set()) for r in rarities))
+        if changed_since is not None:
+            # Only the config side is known without downloading, source art
+            # changes are still caught by the manifest during the render
+            recorded = changed_since.get("cards", {})
+            matches = {
+                pos for pos in matches
+                if recorded.get(self.entries[pos]["id"], {}).get("inputs", {}).get("entry") != hash_entry(self.entries[pos])
+            }
+
+        return [self.entries[pos] for pos in sorted(matches)]
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import pickle
+
+import json5 as json
+
+# Parsing json5 is slow in pure Python, so every catalog we read is also
+# kept as a pickle snapshot. A snapshot is only used while the source file
+# still has the same path, mtime and size, otherwise it is rebuilt.
+CACHE_DIR = ".catalog_cache"
+SNAPSHOT_FORMAT = 1
+
+
+def _snapshot_path(path: str) -> str:
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{os.path.basename(path)}.{key}.pickle")
+
+
+def _source_key(path: str) -> tuple:
+    stat = os.stat(path)
+    return (SNAPSHOT_FORMAT, os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _write_snapshot(path: str, entries: list):
+    snapshot_path = _snapshot_path(path)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((_source_key(path), entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except OSError:
+        pass  # the cache is only an optimisation
+
+
+def load_catalog(path: str) -> list:
+    """Load a json5 catalog, from its snapshot when the file hasn't changed.
+
+    Raises FileNotFoundError like open() when the catalog doesn't exist.
+    """
+    key = _source_key(path)
+    try:
+        with open(_snapshot_path(path), "rb") as f:
+            snapshot_key, entries = pickle.load(f)
+        if snapshot_key == key:
+            return entries
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    with open(path, "r") as f:
+        entries = json.load(f)
+    _write_snapshot(path, entries)
+    return entries
+
+
+def save_catalog(path: str, entries: list):
+    """Write the catalog as json5 and refresh its snapshot straight away.
+
+    The file is replaced in one step, so a crash never leaves half a catalog.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entries, f, indent=4)
+    os.replace(tmp_path, path)
+    _write_snapshot(path, entries)
@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+
+from catalog import load_catalog, save_catalog
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    set_key TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    rarity TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cards_set ON cards (set_key, number);
+CREATE INDEX IF NOT EXISTS cards_rarity ON cards (rarity);
+CREATE TABLE IF NOT EXISTS keywords (
+    card_id TEXT NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (card_id, keyword)
+);
+CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords (keyword);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS unexported (
+    card_id TEXT PRIMARY KEY
+);
+"""
+
+
+def _file_stamp(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class CatalogDB:
+    """Optional SQLite store for the card catalog.
+
+    Each entry is kept verbatim as JSON, with its set, number, rarity and
+    keywords copied into indexed columns for lookups. Every edit is its own
+    transaction, so it is on disk as soon as the call returns. The json5
+    file stays the format everything else reads; use import_json5() and
+    export_json5() to move between the two. Cards edited since the last
+    export are listed in unexported, so sync_json5() keeps them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def __contains__(self, card_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM cards WHERE id = ?", (card_id,)).fetchone() is not None
+
+    def _write(self, entry: dict):
+        card_id = entry["id"]
+        set_key, number = card_id.split("-")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cards (id, set_key, number, rarity, data) VALUES (?, ?, ?, ?, ?)",
+            (card_id, set_key, int(number), entry.get("rarity"), json.dumps(entry)),
+        )
+        self.conn.execute("DELETE FROM keywords WHERE card_id = ?", (card_id,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO keywords (card_id, keyword) VALUES (?, ?)",
+            [(card_id, keyword) for keyword in entry.get("keywords", [])],
+        )
+
+    def _mark_edited(self, card_id: str):
+        self.conn.execute("INSERT OR IGNORE INTO unexported (card_id) VALUES (?)", (card_id,))
+
+    def upsert(self, entry: dict):
+        with self.conn:
+            self._write(entry)
+            self._mark_edited(entry["id"])
+
+    def delete(self, card_id: str) -> bool:
+        with self.conn:
+            self._mark_edited(card_id)
+            return self.conn.execute("DELETE FROM cards WHERE id = ?", (card_id,)).rowcount > 0
+
+    def unexported(self) -> list[str]:
+        """IDs of cards edited or deleted since the last export"""
+        return [row[0] for row in self.conn.execute("SELECT card_id FROM unexported ORDER BY card_id")]
+
+    def get(self, card_id: str) -> dict | None:
+        row = self.conn.execute("SELECT data FROM cards WHERE id = ?", (card_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(self, set_key: str | None = None, keyword: str | None = None, rarity: str | None = None) -> list[dict]:
+        """Entries matching every given filter, in card order"""
+        sql = "SELECT cards.data FROM cards"
+        where = []
+        params = []
+        if keyword is not None:
+            sql += " JOIN keywords ON keywords.card_id = cards.id"
+            where.append("keywords.keyword = ?")
+            params.append(keyword)
+        if set_key is not None:
+            where.append("cards.set_key = ?")
+            params.append(set_key)
+        if rarity is not None:
+            where.append("cards.rarity = ?")
+            params.append(rarity)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY cards.set_key, cards.number"
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def entries(self) -> list[dict]:
+        return self.query()
+
+    def import_entries(self, entries: list[dict], replace: bool = True):
+        """Load entries in one transaction. Later duplicates of an ID win. Replacing also drops unexported edits"""
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM cards")
+                self.conn.execute("DELETE FROM unexported")
+            for entry in entries:
+                self._write(entry)
+
+    def _set_stamp(self, path: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json5_stamp', ?)", (_file_stamp(path),))
+
+    def import_json5(self, path: str, replace: bool = True):
+        self.import_entries(load_catalog(path), replace)
+        with self.conn:
+            self._set_stamp(path)
+
+    def export_json5(self, path: str):
+        """Write the catalog in the usual json5 layout, sorted by card number"""
+        save_catalog(path, self.entries())
+        with self.conn:
+            self._set_stamp(path)
+            self.conn.execute("DELETE FROM unexported")
+
+    def sync_json5(self, path: str) -> bool:
+        """Re-import the json5 file if it changed since the last import or export.
+
+        Cards edited since the last export keep their edit over the file's
+        version and stay unexported.
+        """
+        if not os.path.exists(path):
+            return False
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'json5_stamp'").fetchone()
+        if row is not None and row[0] == _file_stamp(path):
+            return False
+        entries = load_catalog(path)
+        with self.conn:
+            edited = {card_id: self.get(card_id) for card_id in self.unexported()}
+            self.conn.execute("DELETE FROM cards")
+            for entry in entries:
+                self._write(entry)
+            for card_id, entry in edited.items():
+                if entry is None:
+                    self.conn.execute("DELETE FROM cards WHERE id = ?", (card_id,))
+                else:
+                    self._write(entry)
+            self._set_stamp(path)
+        return True
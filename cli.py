@@ -0,0 +1,388 @@
+"""Command-line entry point for rendering and scanning without prompts.
+
+    python cli.py render --keyword hidden
+    python cli.py render --ids 1-20,150 --alt-art --archive
+    python cli.py render --both-art
+    python cli.py render --changed
+    python cli.py scan --set OGS --ids 3,7
+    python cli.py ocr-serve
+    python cli.py ocr-fit --ids 1-40
+    python cli.py list --rarity epic --keyword spell
+    python cli.py preview --by keyword --rarity epic
+    python cli.py diff scraped_cards.json5 scraped_cards_tester.json5 --patch changes.json
+    python cli.py merge --theirs scraped_cards_tester.json5
+    python cli.py check old/ImagesFinal ImagesFinal --tolerance 2
+    python cli.py rarity-fit
+    python cli.py sort
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+
+from card_index import CardIndex, card_number, parse_id_spec
+from catalog import load_catalog, save_catalog
+from contact_sheet import GROUPINGS, SHEET_DIR, ThumbnailCache, build_contact_sheets
+from image_compare import MAX_CHANGED_FRACTION, TOLERANCE, compare_renders, is_regression, print_report
+from json_comparer import MERGE_BASE_FILE, apply_patch, compare_catalogs, diff_catalogs, load_catalog_spec, merge_catalogs, summarize_patch
+from manifest import load_manifest
+from rarity import CENTROIDS_FILE, FIT_CATALOGS
+
+# Catalog file for each set, the selection index is built from these
+CATALOGS = {"OGN": "scraped_cards.json5", "OGS": "scraped_cards_ogs.json5"}
+
+# Sets main.py can render, each has its numbering and output folders in main.SET_STYLES
+RENDER_SETS = {"OGN", "OGS"}
+
+# Scanner module for each set
+SCANNERS = {"OGN": "auto_config", "OGS": "auto_config_ogs"}
+
+# Where the OGN scanner writes its results
+SCAN_RESULTS = "scraped_cards_tester.json5"
+
+
+def load_index(sets=None) -> CardIndex:
+    entries = []
+    for set_key, path in CATALOGS.items():
+        if sets and set_key not in sets:
+            continue
+        if os.path.exists(path):
+            entries += load_catalog(path)
+    return CardIndex(entries)
+
+
+def id_spec(value: str) -> str:
+    """argparse type for --ids, so a malformed spec is a usage error rather than a traceback"""
+    try:
+        parse_id_spec(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def add_selection_args(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("card selection (filters combine, repeated values match any)")
+    group.add_argument("--set", dest="sets", action="append", type=str.upper, choices=sorted(CATALOGS), help="set code")
+    group.add_argument("--ids", type=id_spec, help='card numbers or IDs, e.g. "1-20,150,OGS-007"')
+    group.add_argument("--keyword", dest="keywords", action="append", help="cards with this keyword")
+    group.add_argument("--rarity", dest="rarities", action="append", help="cards with this rarity")
+    group.add_argument("--changed", action="store_true", help="cards whose config entry changed since the last render")
+    group.add_argument("--manifest", help="manifest for --changed, defaults to the render output's")
+
+
+def has_selection(args) -> bool:
+    return bool(args.sets or args.ids or args.keywords or args.rarities or args.changed)
+
+
+def changed_manifest(args) -> dict | None:
+    if not args.changed:
+        return None
+    if args.manifest:
+        return load_manifest(args.manifest)
+    import main
+    cards = {}
+    for set_key in sorted(set(args.sets or RENDER_SETS) & RENDER_SETS):
+        cards.update(load_manifest(main.manifest_path_for(getattr(args, "archive", False), set_key=set_key))["cards"])
+    return {"cards": cards}
+
+
+def select(args, index: CardIndex) -> list[dict]:
+    return index.select(
+        sets=args.sets,
+        id_spec=args.ids,
+        keywords=args.keywords,
+        rarities=args.rarities,
+        changed_since=changed_manifest(args),
+    )
+
+
+def cmd_list(args):
+    for entry in select(args, load_index(args.sets)):
+        print(entry["id"])
+
+
+def render_selection(args) -> list[dict]:
+    sets = set(args.sets or RENDER_SETS)
+    unsupported = sets - RENDER_SETS
+    if unsupported:
+        sys.exit(f"❌ Rendering is not supported for: {', '.join(sorted(unsupported))}")
+    return select(args, load_index(sets))
+
+
+def split_by_set(entries: list[dict]) -> dict[str, list[dict]]:
+    by_set = {}
+    for entry in entries:
+        by_set.setdefault(entry["id"].split("-")[0], []).append(entry)
+    return by_set
+
+
+def preview_sets(entries: list[dict], by: str, out_dir: str, source_for, cache: ThumbnailCache | None = None):
+    """Contact sheets per set, in a subfolder of out_dir when there are several"""
+    by_set = split_by_set(entries)
+    for set_key, set_entries in by_set.items():
+        source = source_for(set_key)
+        if not os.path.exists(source):
+            print(f"❌ Nothing rendered at {source}")
+            continue
+        print(f"Previewing {len(set_entries)} cards from {source}")
+        build_contact_sheets(set_entries, source, by=by, out_dir=os.path.join(out_dir, set_key) if len(by_set) > 1 else out_dir,
+                             cache=cache)
+
+
+def cmd_render(args):
+    entries = render_selection(args)
+    print(f"Processing {len(entries)} cards")
+    if args.dry_run:
+        for entry in entries:
+            print(entry["id"])
+        return
+
+    import main
+    import tracing
+    if args.trace:
+        tracing.enable()
+    thumbnails = ThumbnailCache() if args.preview else None
+    try:
+        main.render(entries, alt_art=args.alt_art, archive=args.archive, force=args.force, full_build=not has_selection(args),
+                    thumbnails=thumbnails, both_art=args.both_art, base_images=False if args.no_base_images else None)
+        if args.preview:
+            source_for = main.archive_path_for if args.archive else lambda set_key: main.output_dirs(set_key)[0]
+            preview_sets(entries, args.preview, SHEET_DIR, source_for, thumbnails)
+    finally:
+        if args.trace:
+            tracing.export_chrome_trace(args.trace)
+            tracing.print_summary()
+
+
+def cmd_preview(args):
+    entries = render_selection(args)
+    if args.source is not None:
+        if not os.path.exists(args.source):
+            sys.exit(f"❌ Nothing rendered at {args.source}")
+        print(f"Previewing {len(entries)} cards from {args.source}")
+        build_contact_sheets(entries, args.source, by=args.by, out_dir=args.out)
+        return
+
+    import main
+
+    def source_for(set_key):
+        final_dir = main.output_dirs(set_key)[0]
+        return final_dir if os.path.isdir(final_dir) and os.listdir(final_dir) else main.archive_path_for(set_key)
+
+    preview_sets(entries, args.by, args.out, source_for)
+
+
+def cmd_scan(args):
+    filtered = args.keywords or args.rarities or args.changed
+    index = load_index(args.sets) if filtered else None
+    numbers, card_ids = parse_id_spec(args.ids) if args.ids else (set(), set())
+
+    for set_key in args.sets or ["OGN"]:
+        if filtered:
+            # Rescan cards already in the catalog that match the filters
+            card_nums = sorted(card_number(entry["id"]) for entry in select(args, index) if entry["id"].startswith(f"{set_key}-"))
+        elif args.ids:
+            card_nums = sorted(numbers | {card_number(c) for c in card_ids if c.startswith(f"{set_key}-")})
+        else:
+            card_nums = None
+
+        print(f"🔎 Scanning {set_key}: {'all cards' if card_nums is None else card_nums}")
+        if args.dry_run or card_nums == []:
+            continue
+        importlib.import_module(SCANNERS[set_key]).scrape_cards(card_nums, resume=not args.fresh)
+
+
+def cmd_ocr_serve(args):
+    from ocr_service import serve
+    serve()
+
+
+def cmd_ocr_fit(args):
+    from ocr_service import fit_ocr_boxes
+    numbers, card_ids = parse_id_spec(args.ids)
+    card_nums = sorted(numbers | {card_number(c) for c in card_ids if c.startswith(f"{args.set}-")})
+    fit_ocr_boxes(importlib.import_module(SCANNERS[args.set]), card_nums)
+
+
+def cmd_diff(args):
+    catalogs = {spec: load_catalog_spec(spec) for spec in args.catalogs}
+    if len(catalogs) < 2:
+        sys.exit("❌ Give at least two catalogs to compare")
+
+    if len(catalogs) == 2:
+        ops = diff_catalogs(*catalogs.values())
+        if args.patch:
+            with open(args.patch, "w") as f:
+                json.dump(ops, f, indent=2)
+            print(f"💾 Wrote {len(ops)} operations to {args.patch}")
+        else:
+            for op in ops:
+                value = f" {json.dumps(op['value'])}" if "value" in op else ""
+                print(f"{op['op']:8} {op['path']}{value}")
+        counts = summarize_patch(ops)
+        print(f"🔍 {counts['added']} added, {counts['removed']} removed, {counts['changed']} changed")
+        return
+
+    if args.patch:
+        sys.exit("❌ --patch needs exactly two catalogs")
+    differing = compare_catalogs(catalogs)
+    # Same letter in a row means the same entry, "-" means the card is missing
+    print("        " + " ".join(f"{chr(ord('A') + i)}" for i in range(len(catalogs))) + "   " +
+          ", ".join(f"{chr(ord('A') + i)}={spec}" for i, spec in enumerate(catalogs)))
+    for card_id, row in differing.items():
+        letters = {}
+        for entry_hash in row.values():
+            if entry_hash is not None and entry_hash not in letters:
+                letters[entry_hash] = chr(ord("a") + len(letters))
+        print(f"{card_id:8}" + " ".join(letters.get(entry_hash, "-") for entry_hash in row.values()))
+    print(f"🔍 {len(differing)} cards differ across {len(catalogs)} catalogs")
+
+
+def cmd_patch(args):
+    with open(args.patch, "r") as f:
+        ops = json.load(f)
+    entries = apply_patch(load_catalog(args.catalog), ops)
+    save_catalog(args.out or args.catalog, entries)
+    print(f"✅ Applied {len(ops)} operations to {args.out or args.catalog}")
+
+
+def cmd_merge(args):
+    ours = load_catalog(args.ours)
+    theirs = load_catalog_spec(args.theirs)
+    if os.path.exists(args.base):
+        base = load_catalog_spec(args.base)
+    else:
+        # Without a base every difference looks like a manual edit, so only new cards come in
+        print(f"⚠️  No merge base at {args.base}, only adding new cards")
+        known = {entry["id"] for entry in ours}
+        base = [entry for entry in theirs if entry["id"] in known]
+
+    merged, conflicts = merge_catalogs(base, ours, theirs)
+    counts = summarize_patch(diff_catalogs(ours, merged))
+    for conflict in conflicts:
+        field = conflict["field"] or "entry"
+        print(f"⚠️  Conflict {conflict['id']} {field}: kept {json.dumps(conflict['ours'])}, scan says {json.dumps(conflict['theirs'])}")
+    print(f"🔀 {counts['added']} added, {counts['changed']} updated, {len(conflicts)} conflicts kept as edited")
+    if args.conflicts:
+        with open(args.conflicts, "w") as f:
+            json.dump(conflicts, f, indent=2)
+    if args.dry_run:
+        return
+    save_catalog(args.ours, merged)
+    save_catalog(args.base, theirs)
+    print(f"💾 Merged into {args.ours}, merge base updated at {args.base}")
+
+
+def cmd_check(args):
+    for path in (args.old, args.new):
+        if not os.path.exists(path):
+            sys.exit(f"❌ Nothing rendered at {path}")
+    report = compare_renders(args.old, args.new, tolerance=args.tolerance, max_changed_fraction=args.max_changed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if is_regression(report):
+        sys.exit(1)
+
+
+def cmd_rarity_fit(args):
+    from rarity import fit_rarity
+    fit_rarity(args.catalogs or FIT_CATALOGS, path=args.out, refresh=args.refresh)
+
+
+def cmd_sort(args):
+    import main
+    main.sort_config_file(args.path)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Riftbound card scraper for Pixelborn")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    render = sub.add_parser("render", help="render card images")
+    add_selection_args(render)
+    art = render.add_mutually_exclusive_group()
+    art.add_argument("--alt-art", action="store_true", help="use alternative art where available")
+    art.add_argument("--both-art", action="store_true", help="render normal art and, into ImagesFinalAlt, alt art in one pass")
+    render.add_argument("--archive", action="store_true", help="write final images into the zip archive")
+    render.add_argument("--no-base-images", action="store_true", help="don't save the plain resized art to ImagesPNG")
+    render.add_argument("--force", action="store_true", help="re-render even if the manifest says up to date")
+    render.add_argument("--trace", metavar="FILE", help="write a Chrome trace of the run")
+    render.add_argument("--preview", metavar="BY", choices=GROUPINGS, help=f"also build contact sheets, grouped by one of: {', '.join(GROUPINGS)}")
+    render.add_argument("--dry-run", action="store_true", help="only print the selected cards")
+    render.set_defaults(func=cmd_render)
+
+    scan = sub.add_parser("scan", help="scan cards with OCR into the catalog")
+    add_selection_args(scan)
+    scan.add_argument("--dry-run", action="store_true", help="only print the selected cards")
+    scan.add_argument("--fresh", action="store_true", help="discard an interrupted full scan instead of resuming it")
+    scan.set_defaults(func=cmd_scan)
+
+    ocr_serve = sub.add_parser("ocr-serve", help="keep the OCR model loaded for scans run while it is up")
+    ocr_serve.set_defaults(func=cmd_ocr_serve)
+
+    ocr_fit = sub.add_parser("ocr-fit", help="learn where text lines sit on the card, so OCR can skip text detection")
+    ocr_fit.add_argument("--set", type=str.upper, choices=sorted(SCANNERS), default="OGN", help="set whose scanner and cards to use")
+    ocr_fit.add_argument("--ids", type=id_spec, default="1-40", help="sample cards, e.g. 1-40,120")
+    ocr_fit.set_defaults(func=cmd_ocr_fit)
+
+    preview = sub.add_parser("preview", help="build contact sheets of rendered cards for review")
+    add_selection_args(preview)
+    preview.add_argument("--by", choices=GROUPINGS, default="card", help="one sheet per card, keyword, rarity or variant")
+    preview.add_argument("--source", help="folder or zip of final images, defaults to the render output")
+    preview.add_argument("--out", default=SHEET_DIR, help="folder for the sheets")
+    preview.set_defaults(func=cmd_preview)
+
+    list_parser = sub.add_parser("list", help="print the IDs of the selected cards")
+    add_selection_args(list_parser)
+    list_parser.set_defaults(func=cmd_list)
+
+    diff = sub.add_parser("diff", help="compare catalogs, a path@rev loads a git revision")
+    diff.add_argument("catalogs", nargs="+", metavar="CATALOG")
+    diff.add_argument("--patch", metavar="FILE", help="write the differences of two catalogs as a JSON patch")
+    diff.set_defaults(func=cmd_diff)
+
+    patch = sub.add_parser("patch", help="apply a JSON patch written by diff")
+    patch.add_argument("patch", metavar="PATCH")
+    patch.add_argument("--catalog", default=CATALOGS["OGN"])
+    patch.add_argument("--out", help="write the result here instead of over the catalog")
+    patch.set_defaults(func=cmd_patch)
+
+    merge = sub.add_parser("merge", help="merge a fresh scan into the catalog, keeping manual edits")
+    merge.add_argument("--theirs", default=SCAN_RESULTS, help="scan results to merge in")
+    merge.add_argument("--ours", default=CATALOGS["OGN"], help="catalog with manual edits, updated in place")
+    merge.add_argument("--base", default=MERGE_BASE_FILE, help="scan results as of the last merge")
+    merge.add_argument("--conflicts", metavar="FILE", help="also write the conflicts as JSON")
+    merge.add_argument("--dry-run", action="store_true", help="only report what would change")
+    merge.set_defaults(func=cmd_merge)
+
+    check = sub.add_parser("check", help="compare two renders pixel by pixel, exits 1 if they differ")
+    check.add_argument("old", help="folder or zip of the reference render")
+    check.add_argument("new", help="folder or zip of the render to check")
+    check.add_argument("--tolerance", type=int, default=TOLERANCE, help="largest per-channel difference ignored")
+    check.add_argument("--max-changed", type=float, default=MAX_CHANGED_FRACTION, metavar="FRACTION",
+                       help="share of pixels allowed to differ beyond the tolerance")
+    check.add_argument("--json", metavar="FILE", help="also write the full report as JSON")
+    check.set_defaults(func=cmd_check)
+
+    rarity_fit = sub.add_parser("rarity-fit", help="fit the rarity classifier to the labelled catalogs")
+    rarity_fit.add_argument("--catalog", dest="catalogs", action="append", help=f"labelled catalog, defaults to {', '.join(FIT_CATALOGS)}")
+    rarity_fit.add_argument("--out", default=CENTROIDS_FILE, help="where to save the centroids")
+    rarity_fit.add_argument("--refresh", action="store_true", help="download every card again instead of using cached bands")
+    rarity_fit.set_defaults(func=cmd_rarity_fit)
+
+    sort = sub.add_parser("sort", help="sort a catalog file and report duplicates")
+    sort.add_argument("path", nargs="?", default=CATALOGS["OGN"])
+    sort.set_defaults(func=cmd_sort)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Tiled contact sheets for reviewing rendered cards.
+
+Every final image of the selected cards is shrunk to a thumbnail and laid
+out on sheets grouped by card, keyword, rarity or variant, with each tile
+labelled by card ID and variant. Thumbnails are decoded in parallel from
+the output folder or archive and kept in a size-bounded cache on disk, so
+a second review of an unchanged render never decodes a full image. A render
+can also fill the cache straight from its in-memory images.
+
+    python cli.py preview --by keyword
+    python cli.py preview --by variant --ids 1-40 --source ImagesFinal.zip
+    python cli.py render --preview rarity
+"""
+import hashlib
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from tracing import span
+
+SHEET_DIR = "ContactSheets"
+GROUPINGS = ("card", "keyword", "rarity", "variant")
+THUMB_SIZE = 256
+LABEL_HEIGHT = 20
+SHEET_COLUMNS = 8
+SHEET_MAX_TILES = 64  # bigger groups are split over several pages
+SHEET_QUALITY = 90
+DECODE_WORKERS = os.cpu_count() or 2
+DECODE_BATCH = 256  # thumbnails held in memory at once while building sheets
+
+THUMB_CACHE_DIR = ".thumb_cache"
+THUMB_CACHE_MAX_BYTES = 64 * 1024 * 1024
+THUMB_QUALITY = 85
+
+BACKGROUND = (24, 24, 24)
+MISSING = (90, 30, 30)
+TEXT = (220, 220, 220)
+
+
+def file_key(path: str) -> str:
+    """Cache key for an image file, changes whenever the file is rewritten"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def member_key(zip_path: str, name: str, crc: int, size: int) -> str:
+    """Cache key for an archive entry, from the CRC and size in its zip header"""
+    return f"{os.path.abspath(zip_path)}!{name}:{crc:08x}:{size}"
+
+
+def make_thumbnail(img: Image.Image, size: int = THUMB_SIZE) -> Image.Image:
+    """Shrink to fit a size x size box, leaving img untouched"""
+    scale = size / max(img.size)
+    thumb_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return img.resize(thumb_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+class ThumbnailCache:
+    """Thumbnails on disk, keyed by the stamp of the image they came from.
+
+    trim() keeps the folder under max_bytes by deleting the least recently
+    used thumbnails first. Safe to use from several threads.
+    """
+
+    def __init__(self, directory: str = THUMB_CACHE_DIR, max_bytes: int = THUMB_CACHE_MAX_BYTES, size: int = THUMB_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(f"{self.size}:{key}".encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.directory, f"{digest}.jpg")
+
+    def get(self, key: str) -> Image.Image | None:
+        path = self._path(key)
+        try:
+            with Image.open(path) as img:
+                img.load()
+            os.utime(path)  # mark as recently used for trim()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return img
+
+    def put(self, key: str, thumb: Image.Image):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            thumb.save(tmp_path, format="JPEG", quality=THUMB_QUALITY)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # the cache is only an optimisation
+
+    def trim(self) -> int:
+        """Delete least recently used thumbnails until under max_bytes, returns how many"""
+        try:
+            files = [entry for entry in os.scandir(self.directory) if entry.is_file()]
+        except FileNotFoundError:
+            return 0
+        files = sorted(((entry.stat(), entry.path) for entry in files), key=lambda item: item[0].st_mtime_ns)
+        total = sum(stat.st_size for stat, _ in files)
+        removed = 0
+        for stat, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+
+class ImageSource:
+    """Final images by file name, from a folder or a zip archive"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.is_zip = os.path.isfile(path)
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+        if self.is_zip:
+            with zipfile.ZipFile(path) as zf:
+                self.members = {info.filename: info for info in zf.infolist()}
+        else:
+            self.members = dict.fromkeys(os.listdir(path))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.members
+
+    def key(self, name: str) -> str:
+        if self.is_zip:
+            info = self.members[name]
+            return member_key(self.path, name, info.CRC, info.file_size)
+        return file_key(os.path.join(self.path, name))
+
+    def _zip(self) -> zipfile.ZipFile:
+        # One handle per thread so entries are read in parallel
+        zf = getattr(self._local, "zip", None)
+        if zf is None:
+            zf = self._local.zip = zipfile.ZipFile(self.path)
+            with self._lock:
+                self._handles.append(zf)
+        return zf
+
+    def read(self, name: str) -> bytes:
+        if self.is_zip:
+            return self._zip().read(name)
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def open(self, name: str) -> Image.Image:
+        if not self.is_zip:
+            return Image.open(os.path.join(self.path, name))
+        with self._zip().open(name) as f:
+            img = Image.open(f)
+            img.load()
+        return img
+
+    def close(self):
+        with self._lock:
+            for zf in self._handles:
+                zf.close()
+            self._handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def card_tiles(entry: dict) -> list[tuple[str, str]]:
+    """(file name, variant) of every final image a config entry renders to"""
+    from main import Card
+    card = Card.from_dict(entry)
+    tiles = [(f"{card.pixelborn_id('c')}.png", "base")]
+    return tiles + [(f"{pixel_id}.png", variant) for pixel_id, variant in card.variant_plan()]
+
+
+def group_tiles(entries: list[dict], by: str = "card") -> dict[str, list[tuple[str, str]]]:
+    """Group name -> [(file name, label)], each group in config order"""
+    if by not in GROUPINGS:
+        raise ValueError(f"Unknown grouping {by!r}, expected one of {', '.join(GROUPINGS)}")
+    groups = {}
+    for entry in entries:
+        for name, variant in card_tiles(entry):
+            if by == "card":
+                keys = [entry["id"]]
+            elif by == "keyword":
+                keys = entry.get("keywords") or ["none"]
+            elif by == "rarity":
+                keys = [entry.get("rarity") or "none"]
+            else:
+                keys = [variant]
+            for key in keys:
+                groups.setdefault(key, []).append((name, f"{entry['id']} {variant}"))
+    return groups
+
+
+def paginate(groups: dict, by: str, max_tiles: int = SHEET_MAX_TILES) -> list[tuple[str, list]]:
+    """Split groups into (sheet name, tiles) pages of at most max_tiles"""
+    pages = []
+    for key, tiles in groups.items():
+        chunks = [tiles[i:i + max_tiles] for i in range(0, len(tiles), max_tiles)]
+        for page, chunk in enumerate(chunks, start=1):
+            suffix = f"-{page}" if len(chunks) > 1 else ""
+            pages.append((f"{by}-{key}{suffix}", chunk))
+    return pages
+
+
+def compose_sheet(title: str, tiles: list[tuple[str, Image.Image | None]], columns: int = SHEET_COLUMNS) -> Image.Image:
+    """Lay out (label, thumbnail) tiles in a grid under a title, None marks a missing image"""
+    columns = max(1, min(columns, len(tiles)))
+    rows = -(-len(tiles) // columns)
+    cell_height = THUMB_SIZE + LABEL_HEIGHT
+    sheet = Image.new("RGB", (columns * THUMB_SIZE, LABEL_HEIGHT + rows * cell_height), BACKGROUND)
+    draw = ImageDraw.Draw(sheet)
+    draw.text((4, 4), title, fill=TEXT)
+
+    for i, (label, thumb) in enumerate(tiles):
+        x = (i % columns) * THUMB_SIZE
+        y = LABEL_HEIGHT + (i // columns) * cell_height
+        if thumb is None:
+            draw.rectangle((x + 8, y + 8, x + THUMB_SIZE - 8, y + THUMB_SIZE - 8), fill=MISSING)
+            label += " (missing)"
+        else:
+            sheet.paste(thumb, (x + (THUMB_SIZE - thumb.width) // 2, y + (THUMB_SIZE - thumb.height) // 2))
+        draw.text((x + 4, y + THUMB_SIZE + 4), label, fill=TEXT)
+    return sheet
+
+
+def load_thumbnail(source: ImageSource, name: str, cache: ThumbnailCache) -> Image.Image | None:
+    if name not in source:
+        return None
+    try:
+        key = source.key(name)
+        thumb = cache.get(key)
+        if thumb is None:
+            with span("preview.decode", file=name):
+                with source.open(name) as img:
+                    thumb = make_thumbnail(img, cache.size)
+            cache.put(key, thumb)
+        return thumb
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        print(f"✘ Error reading {name}: {e}")
+        return None
+
+
+def build_contact_sheets(entries: list[dict], source_path: str, by: str = "card", out_dir: str = SHEET_DIR,
+                         cache: ThumbnailCache | None = None, workers: int = DECODE_WORKERS) -> list[str]:
+    """Write contact sheets of the rendered entries to out_dir, returning their paths.
+
+    Pages are built in batches of about DECODE_BATCH tiles. Each batch's
+    thumbnails are loaded in parallel, then its sheets are composed and
+    saved in parallel. Memory stays bounded however many cards are reviewed.
+    """
+    if cache is None:
+        cache = ThumbnailCache()
+    pages = paginate(group_tiles(entries, by), by)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+
+    def save(page):
+        title, tiles = page
+        with span("preview.sheet", sheet=title):
+            sheet = compose_sheet(title, tiles)
+            path = os.path.join(out_dir, f"{title}.jpg")
+            sheet.save(path, format="JPEG", quality=SHEET_QUALITY)
+        return path
+
+    with ImageSource(source_path) as source, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        start = 0
+        while start < len(pages):
+            end, tile_count = start, 0
+            while end < len(pages) and (end == start or tile_count + len(pages[end][1]) <= DECODE_BATCH):
+                tile_count += len(pages[end][1])
+                end += 1
+            batch = pages[start:end]
+            start = end
+
+            names = list(dict.fromkeys(name for _, tiles in batch for name, _ in tiles))
+            thumbs = dict(zip(names, pool.map(lambda name: load_thumbnail(source, name, cache), names)))
+            batch = [(title, [(label, thumbs[name]) for name, label in tiles]) for title, tiles in batch]
+            written += pool.map(save, batch)
+
+    cache.trim()
+    print(f"🗂️  Wrote {len(written)} contact sheets to {out_dir} ({cache.hits} cached thumbnails, {cache.misses} decoded)")
+    return written
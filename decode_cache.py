@@ -0,0 +1,116 @@
+"""Decoded card art on disk, shared by the scanners and the renderer.
+
+Decoding a 2x AVIF is the most expensive step before any real work starts,
+and auto_config and main.py decode the same files again on every run. Each
+decoded image is kept here as an uncompressed .npy array, named after the
+hash of the downloaded bytes. A later run that downloads the same bytes
+memory-maps the array and builds the PIL image straight from the mapped
+pages. It still pays one memory copy, because PIL keeps RGB pixels 4 bytes
+wide, but that takes about 4 ms where an AVIF decode takes about 25 ms. The
+folder is kept under max_bytes by deleting the least recently used images
+first.
+"""
+import hashlib
+import os
+import threading
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from tracing import span
+
+DECODE_CACHE_DIR = ".decode_cache"
+DECODE_CACHE_MAX_BYTES = 8 * 1024 * 1024 * 1024  # a full set with alt art, at about 9 MB per card
+
+
+def open_encoded(data: bytes) -> Image.Image:
+    """Decode downloaded image bytes to RGB"""
+    import pillow_avif  # registers the AVIF plugin, only needed once something is decoded
+
+    return Image.open(BytesIO(data)).convert("RGB")
+
+
+def source_key(data: bytes) -> str:
+    """Cache key of downloaded image bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class DecodeCache:
+    """RGB pixels of decoded images, keyed by the hash of their encoded bytes. Safe to use from several threads"""
+
+    def __init__(self, directory: str = DECODE_CACHE_DIR, max_bytes: int = DECODE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key[:32]}.npy")
+
+    def get(self, key: str) -> Image.Image | None:
+        """The cached image, read from a memory map, or None"""
+        path = self._path(key)
+        try:
+            pixels = np.load(path, mmap_mode="r")
+            os.utime(path)  # mark as recently used for trim()
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if pixels.ndim != 3 or pixels.shape[2] != 3 or pixels.dtype != np.uint8:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Image.frombuffer("RGB", (pixels.shape[1], pixels.shape[0]), pixels, "raw", "RGB", 0, 1)
+
+    def put(self, key: str, img: Image.Image):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.asarray(img))
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass  # the cache is only an optimisation
+
+    def decode(self, data: bytes, key: str | None = None) -> Image.Image:
+        """Decode image bytes to RGB, from the cache when they were decoded before"""
+        if key is None:
+            key = source_key(data)
+        img = self.get(key)
+        if img is None:
+            with span("decode.avif"):
+                img = open_encoded(data)
+            self.put(key, img)
+        return img
+
+    def trim(self) -> int:
+        """Delete least recently used images until under max_bytes, returns how many"""
+        try:
+            files = [entry for entry in os.scandir(self.directory) if entry.is_file()]
+        except FileNotFoundError:
+            return 0
+        files = sorted(((entry.stat(), entry.path) for entry in files), key=lambda item: item[0].st_mtime_ns)
+        total = sum(stat.st_size for stat, _ in files)
+        removed = 0
+        for stat, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+
+def decode_image(data: bytes, cache: DecodeCache | None = None, key: str | None = None) -> Image.Image:
+    """Decode to RGB through cache, or straight from the bytes without one"""
+    if cache is None:
+        return open_encoded(data)
+    return cache.decode(data, key)
@@ -0,0 +1,153 @@
+"""Pixel regression check between two renders.
+
+Compares the final images of two output folders or archives, e.g. the
+current ImagesFinal against one made by an optimized renderer. Files are
+first matched by content hash. For zips that hash is the CRC already in
+the header, so nothing is read. Only files whose bytes differ are decoded
+and compared pixel by pixel, with a perceptual hash on top, so re-encoded
+but pixel-identical images are told apart from real changes.
+
+    python cli.py check ImagesFinal ImagesFinal.zip
+    python cli.py check old/ImagesFinal ImagesFinal --tolerance 2 --json report.json
+"""
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from contact_sheet import ImageSource
+from tracing import span
+
+COMPARE_WORKERS = os.cpu_count() or 2
+TOLERANCE = 0  # largest per-channel difference still counted as unchanged
+MAX_CHANGED_FRACTION = 0.0  # share of pixels allowed beyond TOLERANCE
+PHASH_SIZE = 8  # 64-bit difference hash
+
+# Result statuses
+CHANGED = "changed"
+SIZE_CHANGED = "size changed"
+UNREADABLE = "unreadable"
+WITHIN_TOLERANCE = "within tolerance"
+SAME_PIXELS = "same pixels"
+IDENTICAL = "identical"
+
+
+def content_hash(source: ImageSource, name: str) -> tuple[int, int]:
+    """(crc32, size) of the stored bytes, free for zip entries"""
+    if source.is_zip:
+        info = source.members[name]
+        return info.CRC, info.file_size
+    data = source.read(name)
+    return zlib.crc32(data), len(data)
+
+
+def perceptual_hash(img: Image.Image, size: int = PHASH_SIZE) -> int:
+    """Difference hash: one bit per neighbouring pair of a size x size grayscale thumbnail"""
+    pixels = np.asarray(img.convert("L").resize((size + 1, size), Image.Resampling.BOX), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def compare_pixels(a: Image.Image, b: Image.Image, tolerance: int = TOLERANCE) -> dict:
+    """Per-pixel difference stats of two images of the same size"""
+    mode = "RGBA" if "A" in a.getbands() or "A" in b.getbands() else "RGB"
+    diff = np.abs(np.asarray(a.convert(mode), dtype=np.int16) - np.asarray(b.convert(mode), dtype=np.int16))
+    changed = int(np.count_nonzero(diff.max(axis=2) > tolerance))
+    return {
+        "max_diff": int(diff.max()),
+        "mean_diff": round(float(diff.mean()), 4),
+        "changed_pixels": changed,
+        "changed_fraction": round(changed / (diff.shape[0] * diff.shape[1]), 6),
+    }
+
+
+def compare_file(old: ImageSource, new: ImageSource, name: str, tolerance: int = TOLERANCE,
+                 max_changed_fraction: float = MAX_CHANGED_FRACTION) -> dict:
+    """Compare one image present in both sources"""
+    result = {"name": name, "pixelborn_id": os.path.splitext(name)[0]}
+    if content_hash(old, name) == content_hash(new, name):
+        result["status"] = IDENTICAL
+        return result
+
+    try:
+        with span("check.decode", file=name):
+            a, b = old.open(name), new.open(name)
+            a.load()
+            b.load()
+    except OSError as e:
+        result.update(status=UNREADABLE, error=str(e))
+        return result
+
+    with a, b, span("check.pixels", file=name):
+        result["phash_distance"] = bin(perceptual_hash(a) ^ perceptual_hash(b)).count("1")
+        if a.size != b.size:
+            result.update(status=SIZE_CHANGED, old_size=list(a.size), new_size=list(b.size))
+            return result
+        result.update(compare_pixels(a, b, tolerance))
+
+    if result["max_diff"] == 0:
+        result["status"] = SAME_PIXELS
+    elif result["changed_fraction"] <= max_changed_fraction:
+        result["status"] = WITHIN_TOLERANCE
+    else:
+        result["status"] = CHANGED
+    return result
+
+
+def compare_renders(old_path: str, new_path: str, tolerance: int = TOLERANCE,
+                    max_changed_fraction: float = MAX_CHANGED_FRACTION, workers: int = COMPARE_WORKERS) -> dict:
+    """Compare every PNG of two folders or zips. Returns a JSON-ready report"""
+    with ImageSource(old_path) as old, ImageSource(new_path) as new:
+        old_names = {name for name in old.members if name.endswith(".png")}
+        new_names = {name for name in new.members if name.endswith(".png")}
+        common = sorted(old_names & new_names)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(lambda name: compare_file(old, new, name, tolerance, max_changed_fraction), common))
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {
+        "old": old_path,
+        "new": new_path,
+        "tolerance": tolerance,
+        "max_changed_fraction": max_changed_fraction,
+        "compared": len(common),
+        "counts": counts,
+        "only_in_old": sorted(os.path.splitext(name)[0] for name in old_names - new_names),
+        "only_in_new": sorted(os.path.splitext(name)[0] for name in new_names - old_names),
+        "differences": [result for result in results if result["status"] not in (IDENTICAL, SAME_PIXELS, WITHIN_TOLERANCE)],
+        "within_tolerance": [result["pixelborn_id"] for result in results if result["status"] == WITHIN_TOLERANCE],
+    }
+
+
+def is_regression(report: dict) -> bool:
+    """True if any image changed beyond tolerance, or exists on one side only"""
+    return bool(report["only_in_old"] or report["only_in_new"] or report["differences"])
+
+
+def print_report(report: dict):
+    print(f"Compared {report['compared']} images: " + ", ".join(f"{count} {status}" for status, count in sorted(report["counts"].items())))
+    if report["only_in_old"]:
+        print(f"\nOnly in {report['old']} ({len(report['only_in_old'])}): {report['only_in_old']}")
+    if report["only_in_new"]:
+        print(f"\nOnly in {report['new']} ({len(report['only_in_new'])}): {report['only_in_new']}")
+
+    for result in report["differences"]:
+        line = f"  {result['pixelborn_id']}: {result['status']}"
+        if "max_diff" in result:
+            line += (f", {result['changed_pixels']} pixels ({result['changed_fraction']:.4%}) over tolerance,"
+                     f" max diff {result['max_diff']}, mean {result['mean_diff']}")
+        if "phash_distance" in result:
+            line += f", phash distance {result['phash_distance']}"
+        if "error" in result:
+            line += f", {result['error']}"
+        print(line)
+
+    if is_regression(report):
+        print("\n❌ Renders differ")
+    else:
+        print(f"\n✅ Renders match ({len(report['within_tolerance'])} within tolerance)")
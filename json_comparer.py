@@ -1,15 +1,220 @@
-import json5 as json
+"""Diff and merge card catalogs.
 
-def compare_card_files():
-    """Compare scraped_cards.json5 and scraped_cards_tester.json5 for differences"""
+Entries are matched by ID and compared by a structural hash, so only the
+cards that actually differ are looked at field by field. Keyword order is
+ignored, since it doesn't change what gets rendered.
+
+    python cli.py diff scraped_cards.json5 scraped_cards_tester.json5 --patch changes.json
+    python cli.py diff scraped_cards.json5@HEAD~3 scraped_cards.json5@HEAD scraped_cards.json5
+    python cli.py patch changes.json
+    python cli.py merge --theirs scraped_cards_tester.json5
+
+A patch is a JSON Patch (RFC 6902) against the catalog viewed as an object
+keyed by card ID, e.g. {"op": "replace", "path": "/OGN-001/rarity", "value": "rare"}.
+"""
+import hashlib
+import json
+import os
+import subprocess
+
+from card_index import card_number
+from catalog import load_catalog
+
+# Base for three-way merges, refreshed with the scan each time one is merged
+MERGE_BASE_FILE = "scraped_cards.base.json5"
+
+_MISSING = object()
+
+
+def card_sort_key(card_id: str) -> tuple[str, int]:
+    return card_id.split("-")[0], card_number(card_id)
+
+
+def _canonical(entry: dict) -> dict:
+    if isinstance(entry.get("keywords"), list):
+        entry = dict(entry, keywords=sorted(entry["keywords"]))
+    return entry
+
+
+_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+def entry_hash(entry: dict) -> str:
+    """Structural hash of an entry, independent of key and keyword order"""
+    return hashlib.blake2b(_encoder.encode(_canonical(entry)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def same_entry(a: dict | None, b: dict | None) -> bool:
+    """Structural equality, the plain dict compare settles almost every pair"""
+    if a is None or b is None:
+        return a is b
+    return a == b or _canonical(a) == _canonical(b)
+
+
+def same_value(field: str, a, b) -> bool:
+    if field == "keywords" and isinstance(a, list) and isinstance(b, list):
+        return sorted(a) == sorted(b)
+    return a == b
+
+
+def index_catalog(entries: list[dict]) -> dict[str, dict]:
+    """Entries by ID, later duplicates win"""
+    return {entry["id"]: entry for entry in entries}
+
+
+def load_catalog_spec(spec: str) -> list[dict]:
+    """Load a catalog from a path, or from a git revision given as path@rev"""
+    if os.path.exists(spec) or "@" not in spec:
+        return load_catalog(spec)
+    import json5
+    path, rev = spec.rsplit("@", 1)
+    git_path = os.path.relpath(path).replace(os.sep, "/")
+    result = subprocess.run(["git", "show", f"{rev}:./{git_path}"], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise FileNotFoundError(f"{spec}: {result.stderr.strip()}")
+    return json5.loads(result.stdout)
+
+
+def _pointer(card_id: str, field: str | None = None) -> str:
+    parts = [card_id] if field is None else [card_id, field]
+    return "".join("/" + part.replace("~", "~0").replace("/", "~1") for part in parts)
+
+
+def _unpointer(path: str) -> list[str]:
+    return [part.replace("~1", "/").replace("~0", "~") for part in path.split("/")[1:]]
+
+
+def diff_catalogs(old: list[dict], new: list[dict]) -> list[dict]:
+    """JSON Patch that turns old into new, in card order"""
+    old_index, new_index = index_catalog(old), index_catalog(new)
+    ops = []
+    for card_id in sorted(old_index.keys() | new_index.keys(), key=card_sort_key):
+        before, after = old_index.get(card_id), new_index.get(card_id)
+        if after is None:
+            ops.append({"op": "remove", "path": _pointer(card_id)})
+        elif before is None:
+            ops.append({"op": "add", "path": _pointer(card_id), "value": after})
+        elif not same_entry(before, after):
+            for field in list(before) + [field for field in after if field not in before]:
+                a, b = before.get(field, _MISSING), after.get(field, _MISSING)
+                if b is _MISSING:
+                    ops.append({"op": "remove", "path": _pointer(card_id, field)})
+                elif a is _MISSING:
+                    ops.append({"op": "add", "path": _pointer(card_id, field), "value": b})
+                elif not same_value(field, a, b):
+                    ops.append({"op": "replace", "path": _pointer(card_id, field), "value": b})
+    return ops
+
+
+def apply_patch(entries: list[dict], ops: list[dict]) -> list[dict]:
+    """Apply a patch from diff_catalogs(), returning the entries sorted by card"""
+    index = {card_id: dict(entry) for card_id, entry in index_catalog(entries).items()}
+    for op in ops:
+        parts = _unpointer(op["path"])
+        card_id = parts[0]
+        if op["op"] not in ("add", "remove", "replace") or len(parts) not in (1, 2):
+            raise ValueError(f"Unsupported patch operation: {op}")
+        if len(parts) == 1:
+            if op["op"] == "remove":
+                index.pop(card_id)
+            else:
+                index[card_id] = dict(op["value"])
+        elif op["op"] == "remove":
+            del index[card_id][parts[1]]
+        else:
+            index[card_id][parts[1]] = op["value"]
+    return [index[card_id] for card_id in sorted(index, key=card_sort_key)]
+
+
+def compare_catalogs(catalogs: dict[str, list[dict]]) -> dict[str, dict[str, str | None]]:
+    """Card ID -> {catalog name: entry hash or None} for cards that differ between any of them.
+
+    Only cards that fail the quick equality check against the first catalog get hashed.
+    """
+    indexes = {name: index_catalog(entries) for name, entries in catalogs.items()}
+    card_ids = set().union(*indexes.values()) if indexes else set()
+    differing = {}
+    for card_id in card_ids:
+        row = [index.get(card_id) for index in indexes.values()]
+        if all(entry == row[0] for entry in row[1:]):
+            continue
+        hashes = [None if entry is None else entry_hash(entry) for entry in row]
+        if len(set(hashes)) > 1:
+            differing[card_id] = dict(zip(indexes, hashes))
+    return {card_id: differing[card_id] for card_id in sorted(differing, key=card_sort_key)}
+
+
+def merge_catalogs(base: list[dict], ours: list[dict], theirs: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Three-way merge of a fresh scan (theirs) into the edited catalog (ours).
+
+    Per field, a change on only one side since base wins. When both sides
+    changed a field differently, ours is kept and the field is reported as
+    a conflict. Cards new in theirs are added, and cards missing from theirs
+    are kept since a scan may only cover part of a set. Returns (merged
+    entries, conflicts).
+    """
+    base_index, ours_index, theirs_index = index_catalog(base), index_catalog(ours), index_catalog(theirs)
+    merged = {}
+    conflicts = []
+
+    for card_id in ours_index.keys() | theirs_index.keys():
+        b, o, t = base_index.get(card_id), ours_index.get(card_id), theirs_index.get(card_id)
+
+        if t is None or same_entry(o, t) or same_entry(t, b):
+            result = o
+        elif same_entry(o, b):
+            result = t
+        elif o is None:
+            # Deleted by hand but the scan changed it, leave it deleted
+            result = None
+            conflicts.append({"id": card_id, "field": None, "base": b, "ours": None, "theirs": t})
+        else:
+            b = b or {}
+            result = {}
+            for field in list(o) + [field for field in t if field not in o] + [field for field in b if field not in o and field not in t]:
+                bv, ov, tv = b.get(field, _MISSING), o.get(field, _MISSING), t.get(field, _MISSING)
+                if same_value(field, ov, tv) or same_value(field, tv, bv):
+                    value = ov
+                elif same_value(field, ov, bv):
+                    value = tv
+                else:
+                    value = ov
+                    conflicts.append({
+                        "id": card_id,
+                        "field": field,
+                        "base": None if bv is _MISSING else bv,
+                        "ours": None if ov is _MISSING else ov,
+                        "theirs": None if tv is _MISSING else tv,
+                    })
+                if value is not _MISSING:
+                    result[field] = value
+        if result is not None:
+            merged[card_id] = result
+
+    entries = [merged[card_id] for card_id in sorted(merged, key=card_sort_key)]
+    conflicts.sort(key=lambda conflict: card_sort_key(conflict["id"]))
+    return entries, conflicts
+
+
+def summarize_patch(ops: list[dict]) -> dict[str, int]:
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    changed = set()
+    for op in ops:
+        parts = _unpointer(op["path"])
+        if len(parts) == 1:
+            counts["added" if op["op"] == "add" else "removed"] += 1
+        else:
+            changed.add(parts[0])
+    counts["changed"] = len(changed)
+    return counts
+
+
+def compare_card_files(main_path="scraped_cards.json5", tester_path="scraped_cards_tester.json5"):
+    """Compare two catalogs (by default scraped_cards.json5 and scraped_cards_tester.json5) for differences"""
     try:
         # Load both files
-        with open("scraped_cards.json5", "r") as f:
-            main_data = json.load(f)
-        
-        with open("scraped_cards_tester.json5", "r") as f:
-            tester_data = json.load(f)
-        
+        main_data = load_catalog_spec(main_path)
+        tester_data = load_catalog_spec(tester_path)
         # Convert to dictionaries for easier comparison
         main_dict = {item["id"]: item for item in main_data}
         tester_dict = {item["id"]: item for item in tester_data}
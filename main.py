@@ -1,17 +1,119 @@
 import os
-import json5 as json
-import requests
+import shutil
+import statistics
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
-import pillow_avif
-from cairosvg import svg2png
+from archive import ArchiveWriter
+from catalog import load_catalog, save_catalog
+from contact_sheet import file_key, make_thumbnail, member_key
+from decode_cache import DecodeCache, decode_image
+from manifest import hash_bytes, hash_entry, is_up_to_date, load_manifest, prune_manifest, record_card, remove_file, save_manifest
+from pipeline import Stage, run_pipeline
+from tracing import span
 
 # === Config ===
 FINAL_DIR = "ImagesFinal"
 PNG_DIR = "ImagesPNG"
 CONFIG_PATH = "scraped_cards.json5"
-os.makedirs(FINAL_DIR, exist_ok=True)
-os.makedirs(PNG_DIR, exist_ok=True)
+RENDERER_VERSION = 2  # bump whenever a change to the renderer or its assets changes the output
+FORCE_REBUILD = False
+ARCHIVE_OUTPUT = False  # stream ImagesFinal straight into ARCHIVE_PATH instead of a folder
+ARCHIVE_PATH = "ImagesFinal.zip"
+# Alt art output when normal and alt art are rendered in one pass
+ALT_FINAL_DIR = "ImagesFinalAlt"
+ALT_PNG_DIR = "ImagesPNGAlt"
+WRITE_BASE_IMAGES = True  # also save the plain resized art to ImagesPNG, nothing downstream reads it
+CACHE_DECODED = False  # keep decoded art memory-mappable in .decode_cache (about 9 MB per card), see decode_cache.py
+# Cards are started longest job first, so the heavy ones don't finish last on
+# one worker while the rest sit idle. Costs are in units of one darkened
+# variant, and a card's recorded render time replaces the estimate once known
+SCHEDULE_LONGEST_FIRST = True
+BASE_RENDER_COST = 3.0  # decode, resize, modifications and the base images
+VARIANT_COSTS = {"tap": 2.0, "damage": 1.5, "accelerate_buffs": 1.5, "play_buffs": 1.5}  # others cost 1
+MANIFEST_SAVE_EVERY = 25  # cards between manifest saves, it is always saved when a render ends or stops
+INFLIGHT_CARDS = 8  # cards held in memory at once, from download until written
+FETCH_WORKERS = 4
+RENDER_WORKERS = os.cpu_count() or 2
+
+# Per-set rendering. Sets share the renderer and differ only in numbering,
+# output folders and a few icon stroke widths. The manifest and archive of
+# each folder are named after it, e.g. ImagesFinal_OGS.manifest.json
+SET_STYLES = {
+    "OGN": {
+        "set_num": 1,
+        "internal_numb": 0,  # currently hardcoded as 00, variants count up from here
+        "config": CONFIG_PATH,
+        "final_dir": FINAL_DIR,
+        "png_dir": PNG_DIR,
+        "alt_final_dir": ALT_FINAL_DIR,
+        "alt_png_dir": ALT_PNG_DIR,
+        "strokes": {"draw": 3, "channel": 1.5},
+    },
+    "OGS": {
+        "set_num": 1,
+        "internal_numb": 10,
+        "config": "scraped_cards_ogs.json5",
+        "final_dir": "ImagesFinal_OGS",
+        "png_dir": "ImagesPNG_OGS",
+        "alt_final_dir": "ImagesFinalAlt_OGS",
+        "alt_png_dir": "ImagesPNGAlt_OGS",
+        "strokes": {"draw": 2, "channel": 1},
+    },
+}
+DEFAULT_SET = "OGN"  # style for cards of sets missing from SET_STYLES
+RENDER_SETS = ["OGN"]  # sets main() renders, e.g. ["OGN", "OGS"] for both in one pass
+
+
+@lru_cache(maxsize=8)
+def darken_lut(ratio: float) -> tuple[int, ...]:
+    """Per-value table of ImageEnhance.Brightness(ratio), taken from PIL itself so img.point() matches it exactly"""
+    ramp = Image.frombytes("RGB", (256, 1), bytes(v for v in range(256) for _ in range(3)))
+    return tuple(ImageEnhance.Brightness(ramp).enhance(ratio).getchannel(0).tobytes())
+
+
+@lru_cache(maxsize=4)
+def tap_mask(size: tuple[int, int]) -> Image.Image:
+    """Mask of the tap variant, white where the card is left untouched. Shared, never drawn on"""
+    # Easy to modify dimensions
+    bottom_rect_width = 670      # Width of the untouched rectangle
+    bottom_rect_height = 320     # Height of the untouched rectangle  
+    bottom_margin = 60           # Distance from bottom edge
+    fade_distance = 20
+    
+    # Calculate rectangle position
+    img_width, img_height = size
+    rect_x = (img_width - bottom_rect_width) // 2  # Center horizontally
+    rect_y = img_height - bottom_rect_height - bottom_margin  # Position from bottom
+    
+    # Create mask for the rectangle area with fade
+    mask = Image.new("L", size, 0)  # Start with all black (darkened)
+    mask_draw = ImageDraw.Draw(mask)
+    
+    # Draw the main white rectangle (full brightness area)
+    inner_rect = [rect_x + fade_distance, rect_y + fade_distance, 
+                rect_x + bottom_rect_width - fade_distance, 
+                rect_y + bottom_rect_height - fade_distance]
+    mask_draw.rectangle(inner_rect, fill=255)
+    
+    # Create gradient fade around the edges
+    for i in range(fade_distance):
+        # Calculate fade intensity (255 at center, 0 at edge)
+        fade_intensity = int(255 * (i + 1) / fade_distance)
+        
+        # Draw expanding rectangles with decreasing intensity
+        fade_rect = [rect_x + fade_distance - i, rect_y + fade_distance - i,
+                    rect_x + bottom_rect_width - fade_distance + i,
+                    rect_y + bottom_rect_height - fade_distance + i]
+        mask_draw.rectangle(fade_rect, outline=fade_intensity, width=1)
+    
+    # Apply gaussian blur to smooth the fade
+    return mask.filter(ImageFilter.GaussianBlur(radius=fade_distance // 4))
+
 
 # === Card Class ===
 class Card:
@@ -20,7 +122,10 @@ class Card:
         self.keywords = keywords
         self.rarity = rarity
         self.set_key, self.card_num = self.id.split("-")
-        self.pixelborn_internal_numb = 0  # currently hardcoded as 00
+        self.style_key = self.set_key if self.set_key in SET_STYLES else DEFAULT_SET
+        self.style = SET_STYLES[self.style_key]
+        self.pixelborn_internal_numb = self.style["internal_numb"]
+        self._layers = {}  # darkened art shared by the variants, see _layer()
 
     @classmethod
     def from_dict(cls, data: dict):
@@ -30,51 +135,77 @@ class Card:
             rarity=data.get("rarity", "common")
         )
 
-    def pixelborn_id(self, first_letter):
-        set_config = {"OGN": 1}
-        set_num = set_config.get(self.set_key, 1)
-        return first_letter + f"{set_num:03d}" + f"{self.pixelborn_internal_numb:02d}" + self.card_num
+    def pixelborn_id(self, first_letter, internal_numb: int | None = None):
+        set_num = self.style["set_num"]
+        if internal_numb is None:
+            internal_numb = self.pixelborn_internal_numb
+        return first_letter + f"{set_num:03d}" + f"{internal_numb:02d}" + self.card_num
+
+    def art_url(self, alt_art: bool = False) -> str:
+        suffix = "a" if alt_art else ""
+        return f"https://cdn.rgpub.io/public/live/map/riftbound/latest/{self.set_key}/cards/{self.id}{suffix}/full-desktop-2x.avif"
+
+    def _get(self, url: str) -> "requests.Response":
+        import requests
+
+        with span("download", card=self.id, url=url):
+            return requests.get(url, timeout=10)
+
+    def download_image_bytes(self, alt_art: bool | None = None) -> bytes | None:
+        if alt_art is None:
+            alt_art = ALT_ART
+        attempts = [(self.art_url(), "✔ Downloaded")]
+        if alt_art:
+            # Cards without alt art fall back to the base image
+            attempts.insert(0, (self.art_url(alt_art=True), "✔ Downloaded ALT"))
+
+        try:
+            for url, message in attempts:
+                response = self._get(url)
+                if response.status_code == 200:
+                    print(f"{message}: {self.id}")
+                    return response.content
+            print(f"✘ Not found: {self.id} (HTTP {response.status_code})")
+        except Exception as e:
+            print(f"✘ Error downloading {self.id}: {e}")
+        return None
+
+    def download_art_pair(self) -> tuple[bytes | None, bytes | None, bool]:
+        """(normal art, alt art or None when the card has none, whether asking for the alt art worked), each fetched once"""
+        try:
+            response = self._get(self.art_url(alt_art=True))
+        except Exception as e:
+            # Not the same as having no alt art, only the alt art output has to wait
+            print(f"✘ Error downloading ALT {self.id}: {e}")
+            return self.download_image_bytes(alt_art=False), None, False
+        alt = response.content if response.status_code == 200 else None
+        if alt is not None:
+            print(f"✔ Downloaded ALT: {self.id}")
+        return self.download_image_bytes(alt_art=False), alt, True
 
     def download_image(self) -> Image.Image | None:
-        if ALT_ART:
-            url = f"https://cdn.rgpub.io/public/live/map/riftbound/latest/{self.set_key}/cards/{self.id}a/full-desktop-2x.avif"
-        else:
-            url = f"https://cdn.rgpub.io/public/live/map/riftbound/latest/{self.set_key}/cards/{self.id}/full-desktop-2x.avif"
-        
-        if ALT_ART:
-            try:
-                response = requests.get(url, timeout=10)
-                if response.status_code == 200:
-                    print(f"✔ Downloaded ALT: {self.id}")
-                    return Image.open(BytesIO(response.content)).convert("RGB")
-                else:
-                    url = f"https://cdn.rgpub.io/public/live/map/riftbound/latest/{self.set_key}/cards/{self.id}/full-desktop-2x.avif"
-                    response = requests.get(url, timeout=10)
-                    if response.status_code == 200:
-                        print(f"✔ Downloaded: {self.id}")
-                        return Image.open(BytesIO(response.content)).convert("RGB")
-                    else:
-                        print(f"✘ Not found: {self.id} (HTTP {response.status_code})")
-            except Exception as e:
-                print(f"✘ Error downloading {self.id}: {e}")
-            return None
-        else:
-            try:
-                response = requests.get(url, timeout=10)
-                if response.status_code == 200:
-                    print(f"✔ Downloaded: {self.id}")
-                    return Image.open(BytesIO(response.content)).convert("RGB")
-                else:
-                    print(f"✘ Not found: {self.id} (HTTP {response.status_code})")
-            except Exception as e:
-                print(f"✘ Error downloading {self.id}: {e}")
+        data = self.download_image_bytes()
+        if data is None:
             return None
+        return decode_image(data, DECODED)
 
     def resize_and_pad(self, img: Image.Image) -> Image.Image:
+        """Scale to 1024 high and centre on a black square"""
+        with span("resize_and_pad", card=self.id):
+            return self._resize_and_pad(img)
+
+    def _resize_and_pad(self, img: Image.Image) -> Image.Image:
         orig_w, orig_h = img.size
         scale = 1024 / orig_h
         new_w = int(orig_w * scale)
-        resized = img.resize((new_w, 1024), Image.LANCZOS)
+
+        # Cheap integer box shrink first, then LANCZOS over what's left. The box
+        # keeps the sub-pixel alignment so the result approximates a direct resample
+        factor = orig_h // 1024
+        if factor > 1:
+            resized = img.reduce(factor).resize((new_w, 1024), Image.LANCZOS, box=(0, 0, orig_w / factor, orig_h / factor))
+        else:
+            resized = img.resize((new_w, 1024), Image.LANCZOS)
 
         canvas = Image.new("RGB", (1024, 1024), (0, 0, 0))
         offset = (1024 - new_w) // 2
@@ -107,74 +238,105 @@ class Card:
 
         return img
     
-    def apply_extra_modifications(self, img: Image.Image) -> Image.Image:
-        """Apply keyword-specific modifications and save variants"""
-        base_img = img.copy()
+    def variant_plan(self) -> list[tuple[str, str]]:
+        """Ordered (pixelborn_id, variant) pairs for the keyword variants.
+
+        IDs depend only on the card and its keywords, so variants can be
+        rendered in any order, in parallel, or one at a time.
+        """
+        variants = []
         extra_applied = False
-        
-        # Apply each keyword modification that generates variants
+
         if "accelerate" in self.keywords:
-            self._create_accelerate_variant(base_img)
+            variants.append("accelerate")
             extra_applied = True
         
         if "discard" in self.keywords:
-            self._create_discard_variant(base_img)
+            variants.append("discard")
             extra_applied = True
 
         if "tap" in self.keywords:
-            self._create_tap_variant(base_img)
+            variants.append("tap")
 
         if "draw" in self.keywords:
-            self._create_draw_variant(base_img)
+            variants.append("draw")
             extra_applied = True
 
         if "hidden" in self.keywords:
-            self._create_hidden_variant(base_img)
+            # Hidden also needs a hidden play (eye-off + chevron-right)
+            variants += ["hidden", "hidden_play"]
             extra_applied = True
         
         if "kill" in self.keywords:
-            self._create_kill_variant(base_img)
+            variants.append("kill")
 
         if "spend" in self.keywords:
-            self._create_spend_variant(base_img)
+            variants.append("spend")
 
         if "qiyana_victorious" in self.keywords:
-            self._create_draw_variant(base_img)
-            self._create_channel_variant(base_img)
+            variants += ["draw", "channel"]
 
         if "udyr_wildman" in self.keywords:
-            self._create_damage_variant(base_img)
-            self._create_stun_variant(base_img)
-            self._create_ready_variant(base_img)
-            self._create_ganking_variant(base_img)
+            variants += ["damage", "stun", "ready", "ganking"]
 
         if "teemo_legend" in self.keywords:
-            self._create_tap_variant(base_img)
-            self._create_hidden_variant(base_img, only_hidden=True)
+            variants += ["tap", "hidden"]
 
         if "the_dreaming_tree" in self.keywords:
-            self._create_draw_variant(base_img)
+            variants.append("draw")
 
         if "ava_achiever" in self.keywords:
-            self._create_hidden_variant(base_img, only_hidden=True)
+            variants.append("hidden")
 
         if "wallop" in self.keywords:
-            self._create_spend_variant(base_img)
+            variants.append("spend")
             extra_applied = True
 
         if "kraken_hunter" in self.keywords:
-            self._create_accelerate_variant(base_img)
-            self._create_accelerate_buffs_variant(base_img)
-            self._create_play_variant(base_img)
-            self._create_play_buffs_variant(base_img)
+            variants += ["accelerate", "accelerate_buffs", "play", "play_buffs"]
 
         if "commander_ledros" in self.keywords:
-            self._create_play_variant(base_img)
-            self._create_kill_variant(base_img)
+            variants += ["play", "kill"]
             
         if extra_applied and "location" not in self.keywords:
             # Always create the base "play" variant (single triangle)
-            self._create_play_variant(base_img)
+            variants.append("play")
+
+        return [(self.pixelborn_id("a", self.pixelborn_internal_numb + i), variant) for i, variant in enumerate(variants)]
+
+    def render_key(self, pixels_hash: str, renderer_hash: str) -> str:
+        """Hash of everything that decides this card's pixels, but not its file names.
+
+        Cards with the same key render identical images, so one can reuse the other's.
+        """
+        return hash_entry({
+            "pixels": pixels_hash,
+            "renderer": renderer_hash,
+            "keywords": sorted(set(self.keywords)),
+            "rarity": self.rarity,
+            "strokes": self.style["strokes"],
+        })
+
+    def render_variant(self, base_img: Image.Image, variant: str) -> Image.Image:
+        with span(f"variant.{variant}", card=self.id):
+            return getattr(self, f"_create_{variant}_variant")(base_img)
+
+    def apply_extra_modifications(self, img: Image.Image, only: set[str] | None = None, workers: int = 1) -> list[str]:
+        """Render and save keyword-specific variants, returning the saved paths.
+
+        `only` limits the run to the given pixelborn IDs.
+        """
+        base_img = img.copy()
+        plan = [(pixel_id, variant) for pixel_id, variant in self.variant_plan() if only is None or pixel_id in only]
+
+        def render(step):
+            pixel_id, variant = step
+            return self._save(self.render_variant(base_img, variant), FINAL_DIR, pixel_id)
+
+        if workers > 1 and len(plan) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(render, plan))
+        return [render(step) for step in plan]
     
     def _add_svg_overlay(self, img: Image.Image, svg_string: str) -> Image.Image:
         """Generic method to add any SVG icon overlay"""
@@ -186,9 +348,7 @@ class Card:
             img_height = int(img_height * 0.3)
         cx, cy = img_width // 2, img_height
         
-        # Convert SVG to PNG
-        png_data = svg2png(bytestring=svg_string.encode('utf-8'))
-        icon_img = Image.open(BytesIO(png_data)).convert("RGBA")
+        icon_img = svg_icon(svg_string)
         
         # Position the icon at the center
         icon_x = cx - icon_img.width // 2
@@ -210,12 +370,8 @@ class Card:
             img_height = int(img_height * 0.3)
         cy = img_height
 
-        # Convert both SVGs to PNG
-        png_left = svg2png(bytestring=svg_string.encode('utf-8'))
-        png_right = svg2png(bytestring=svg_string_2.encode('utf-8'))
-
-        icon_left = Image.open(BytesIO(png_left)).convert("RGBA")
-        icon_right = Image.open(BytesIO(png_right)).convert("RGBA")
+        icon_left = svg_icon(svg_string)
+        icon_right = svg_icon(svg_string_2)
 
         # Compute horizontal positions (25% and 75% of width)
         left_x = int(img_width * 0.35) - icon_left.width // 2
@@ -234,110 +390,74 @@ class Card:
         return result
 
     
+    def _layer(self, base_img: Image.Image, key, make) -> Image.Image:
+        """Image derived from base_img, made once and shared by every variant drawn on it. Never draw on it"""
+        cached = self._layers.get(key)
+        if cached is not None and cached[0] is base_img:
+            return cached[1]
+        layer = make()
+        self._layers[key] = (base_img, layer)  # two threads may both make it, either copy is fine
+        return layer
+
+    def release_layers(self):
+        self._layers = {}
+
+    def _darken_rgb(self, img: Image.Image, ratio: float = 0.6) -> Image.Image:
+        lut = darken_lut(ratio) * len(img.getbands())
+        return self._layer(img, ("darken", ratio), lambda: img.point(lut))
+
     def _darken_image(self, img: Image.Image, ratio: float = 0.6) -> Image.Image:
-        return ImageEnhance.Brightness(img.copy()).enhance(ratio)
+        """Darkened RGBA, the overlays copy it before pasting so it is shared between variants"""
+        return self._layer(img, ("darken_rgba", ratio), lambda: self._darken_rgb(img, ratio).convert("RGBA"))
     
     def _darken_half_image(self, img: Image.Image, ratio: float = 0.6) -> Image.Image:
         """Darken image but leave bottom rectangular area untouched"""
-        
-        # Easy to modify dimensions
-        bottom_rect_width = 670      # Width of the untouched rectangle
-        bottom_rect_height = 320     # Height of the untouched rectangle  
-        bottom_margin = 60           # Distance from bottom edge
-        fade_distance = 20
-        
-        # Calculate rectangle position
-        img_width, img_height = img.size
-        rect_x = (img_width - bottom_rect_width) // 2  # Center horizontally
-        rect_y = img_height - bottom_rect_height - bottom_margin  # Position from bottom
-        
-        # Create darkened version of the whole image
-        darkened = ImageEnhance.Brightness(img.copy()).enhance(ratio)
-        
-        # Create mask for the rectangle area with fade
-        mask = Image.new("L", img.size, 0)  # Start with all black (darkened)
-        mask_draw = ImageDraw.Draw(mask)
-        
-        # Draw the main white rectangle (full brightness area)
-        inner_rect = [rect_x + fade_distance, rect_y + fade_distance, 
-                    rect_x + bottom_rect_width - fade_distance, 
-                    rect_y + bottom_rect_height - fade_distance]
-        mask_draw.rectangle(inner_rect, fill=255)
-        
-        # Create gradient fade around the edges
-        for i in range(fade_distance):
-            # Calculate fade intensity (255 at center, 0 at edge)
-            fade_intensity = int(255 * (i + 1) / fade_distance)
-            
-            # Draw expanding rectangles with decreasing intensity
-            fade_rect = [rect_x + fade_distance - i, rect_y + fade_distance - i,
-                        rect_x + bottom_rect_width - fade_distance + i,
-                        rect_y + bottom_rect_height - fade_distance + i]
-            mask_draw.rectangle(fade_rect, outline=fade_intensity, width=1)
-        
-        # Apply gaussian blur to smooth the fade
-        mask = mask.filter(ImageFilter.GaussianBlur(radius=fade_distance // 4))
-        
         # Composite: where mask is white (255), use original; where black (0), use darkened
-        result = Image.composite(img, darkened, mask)
-        
-        return result
+        return Image.composite(img, self._darken_rgb(img, ratio), tap_mask(img.size))
 
-    def _create_accelerate_variant(self, base_img: Image.Image):
+    def _create_accelerate_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '<svg xmlns="http://www.w3.org/2000/svg" width="480" height="480" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-chevrons-right-icon lucide-chevrons-right"><path d="m6 17 5-5-5-5"/><path d="m13 17 5-5-5-5"/></svg>')
         
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_discard_variant(self, base_img: Image.Image):
+    def _create_discard_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '<svg xmlns="http://www.w3.org/2000/svg" width="480" height="480" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-chevron-down-icon lucide-chevron-down"><path d="m6 9 6 6 6-6"/></svg>')
         
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_play_variant(self, base_img: Image.Image):
+    def _create_play_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '<svg xmlns="http://www.w3.org/2000/svg" width="480" height="480" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-chevron-right-icon lucide-chevron-right"><path d="m9 18 6-6-6-6"/></svg>')
         
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_tap_variant(self, base_img: Image.Image):
+    def _create_tap_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_half_image(base_img)
         modified = self._add_svg_overlay(darkened, '<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-corner-right-down-icon lucide-corner-right-down"><path d="m10 15 5 5 5-5"/><path d="M4 4h7a4 4 0 0 1 4 4v12"/></svg>')
         
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_draw_variant(self, base_img: Image.Image):
+    def _create_draw_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
-        modified = self._add_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 48" fill="none" stroke="white" stroke-width="3" stroke-linecap="round" stroke-linejoin="round">
+        stroke = self.style["strokes"]["draw"]
+        modified = self._add_svg_overlay(darkened, f'''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 48" fill="none" stroke="white" stroke-width="{stroke}" stroke-linecap="round" stroke-linejoin="round">
                                                         <rect width="24" height="36" x="0" y="6" rx="2"/>
                                                         <path d="M8 24h8"/>
                                                         <path d="M12 20v8"/>
                                                         </svg>''')
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_hidden_variant(self, base_img: Image.Image, only_hidden=False):
+    def _create_hidden_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-eye-off-icon lucide-eye-off"><path d="M10.733 5.076a10.744 10.744 0 0 1 11.205 6.575 1 1 0 0 1 0 .696 10.747 10.747 0 0 1-1.444 2.49"/><path d="M14.084 14.158a3 3 0 0 1-4.242-4.242"/><path d="M17.479 17.499a10.75 10.75 0 0 1-15.417-5.151 1 1 0 0 1 0-.696 10.75 10.75 0 0 1 4.446-5.143"/><path d="m2 2 20 20"/></svg>')
         
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-        if only_hidden:
-            return
-        # Modified hidden requires another hidden play (eye-off + chevron-right)
+    def _create_hidden_play_variant(self, base_img: Image.Image) -> Image.Image:
+        darkened = self._darken_image(base_img)
         combined_svg = '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 48 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
         <!-- Eye-off icon (left side) -->
         <g transform="translate(0,0)">
@@ -353,81 +473,65 @@ class Card:
         </svg>'''
 
         modified = self._add_svg_overlay(darkened, combined_svg)
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_channel_variant(self, base_img: Image.Image):
+    def _create_channel_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
-        modified = self._add_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="1.5" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-import-icon lucide-import"><path d="M12 3v12"/><path d="m8 11 4 4 4-4"/><path d="M8 5H4a2 2 0 0 0-2 2v10a2 2 0 0 0 2 2h16a2 2 0 0 0 2-2V7a2 2 0 0 0-2-2h-4"/></svg>''')
+        stroke = self.style["strokes"]["channel"]
+        modified = self._add_svg_overlay(darkened, f'''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="{stroke}" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-import-icon lucide-import"><path d="M12 3v12"/><path d="m8 11 4 4 4-4"/><path d="M8 5H4a2 2 0 0 0-2 2v10a2 2 0 0 0 2 2h16a2 2 0 0 0 2-2V7a2 2 0 0 0-2-2h-4"/></svg>''')
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_damage_variant(self, base_img: Image.Image):
+    def _create_damage_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_two_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="300" height="300" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-flame-icon lucide-flame"><path d="M8.5 14.5A2.5 2.5 0 0 0 11 12c0-1.38-.5-2-1-3-1.072-2.143-.224-4.054 2-6 .5 2.5 2 4.9 4 6.5 2 1.6 3 3.5 3 5.5a7 7 0 1 1-14 0c0-1.153.433-2.294 1-3a2.5 2.5 0 0 0 2.5 2.5z"/></svg>''', '''<svg xmlns="http://www.w3.org/2000/svg" width="300" height="300" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-flame-icon lucide-flame"><path d="M8.5 14.5A2.5 2.5 0 0 0 11 12c0-1.38-.5-2-1-3-1.072-2.143-.224-4.054 2-6 .5 2.5 2 4.9 4 6.5 2 1.6 3 3.5 3 5.5a7 7 0 1 1-14 0c0-1.153.433-2.294 1-3a2.5 2.5 0 0 0 2.5 2.5z"/></svg>''', False)
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_stun_variant(self, base_img: Image.Image):
+    def _create_stun_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-shell-icon lucide-shell"><path d="M14 11a2 2 0 1 1-4 0 4 4 0 0 1 8 0 6 6 0 0 1-12 0 8 8 0 0 1 16 0 10 10 0 1 1-20 0 11.93 11.93 0 0 1 2.42-7.22 2 2 0 1 1 3.16 2.44"/></svg>''')
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_ready_variant(self, base_img: Image.Image):
+    def _create_ready_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-corner-up-left-icon lucide-corner-up-left"><path d="M20 20v-7a4 4 0 0 0-4-4H4"/><path d="M9 14 4 9l5-5"/></svg>''')
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_ganking_variant(self, base_img: Image.Image):
+    def _create_ganking_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-arrow-left-right-icon lucide-arrow-left-right"><path d="M8 3 4 7l4 4"/><path d="M4 7h16"/><path d="m16 21 4-4-4-4"/><path d="M20 17H4"/></svg>''')
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_kill_variant(self, base_img: Image.Image):
+    def _create_kill_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-x-icon lucide-x"><path d="M18 6 6 18"/><path d="m6 6 12 12"/></svg>''')
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_spend_variant(self, base_img: Image.Image):
+    def _create_spend_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_svg_overlay(darkened, '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-arrow-down-icon lucide-arrow-down"><path d="M12 5v14"/><path d="m19 12-7 7-7-7"/></svg>''')
 
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_accelerate_buffs_variant(self, base_img: Image.Image):
+    def _create_accelerate_buffs_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_two_svg_overlay(darkened, '<svg xmlns="http://www.w3.org/2000/svg" width="480" height="480" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-chevrons-right-icon lucide-chevrons-right"><path d="m6 17 5-5-5-5"/><path d="m13 17 5-5-5-5"/></svg>', '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-arrow-down-icon lucide-arrow-down"><path d="M12 5v14"/><path d="m19 12-7 7-7-7"/></svg>''', True)
         
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
 
-    def _create_play_buffs_variant(self, base_img: Image.Image):
+    def _create_play_buffs_variant(self, base_img: Image.Image) -> Image.Image:
         darkened = self._darken_image(base_img)
         modified = self._add_two_svg_overlay(darkened, '<svg xmlns="http://www.w3.org/2000/svg" width="480" height="480" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-chevron-right-icon lucide-chevron-right"><path d="m9 18 6-6-6-6"/></svg>', '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400" viewBox="0 0 24 24" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-arrow-down-icon lucide-arrow-down"><path d="M12 5v14"/><path d="m19 12-7 7-7-7"/></svg>''', True)
         
-        pixel_id = self.pixelborn_id("a")
-        self.pixelborn_internal_numb += 1
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        return modified
+
+    def _save(self, img: Image.Image, directory: str, pixel_id: str) -> str:
+        return write_output(directory, pixel_id, encode_png(img))
 
     def draw_white_circle(self, draw: ImageDraw.ImageDraw): 
         if 'sigspell' in self.keywords:
@@ -455,38 +559,619 @@ class Card:
 
             draw.ellipse((cx, cy, cx + r, cy + r), fill="white")
 
-    def process(self):
-        img = self.download_image()
-        if img is None:
-            return
+    def process(self, data: bytes | None = None) -> list[str]:
+        """Render the card and its variants, returning every file written"""
+        if data is None:
+            data = self.download_image_bytes()
+            if data is None:
+                return []
+        os.makedirs(FINAL_DIR, exist_ok=True)
+        if WRITE_BASE_IMAGES:
+            os.makedirs(PNG_DIR, exist_ok=True)
+        with span("decode", card=self.id):
+            img = decode_image(data, DECODED)
 
         pixel_id = self.pixelborn_id("c")
 
         img = self.resize_and_pad(img)
-        img.save(os.path.join(PNG_DIR, f"{pixel_id}.png"))
+        outputs = [self._save(img, PNG_DIR, pixel_id)] if WRITE_BASE_IMAGES else []
 
-        modified = self.apply_modifications(img.copy())
-        modified.save(os.path.join(FINAL_DIR, f"{pixel_id}.png"))
+        with span("modifications", card=self.id):
+            modified = self.apply_modifications(img.copy())
+        outputs.append(self._save(modified, FINAL_DIR, pixel_id))
 
-        self.apply_extra_modifications(modified.copy())
+        outputs += self.apply_extra_modifications(modified)
 
         print(f"✅ Saved: {pixel_id}.png")
+        return outputs
+
+
+ALT_ART = False
+DECODED = None  # decode_cache.DecodeCache used by renders when CACHE_DECODED is set
+ARCHIVES = {}  # final image folder -> ArchiveWriter its images are streamed into
+THUMBNAILS = None  # contact_sheet.ThumbnailCache filled from the renders when set
+SPECIFIC_CARDS = []  # optional filter, the manifest already skips unchanged cards
+
+
+@lru_cache(maxsize=64)
+def svg_icon(svg_string: str) -> Image.Image:
+    """Rasterized SVG icon, shared by every card and set. Only ever pasted from, never drawn on"""
+    from cairosvg import svg2png
+
+    with span("svg2png"):
+        png_data = svg2png(bytestring=svg_string.encode('utf-8'))
+        return Image.open(BytesIO(png_data)).convert("RGBA")
+
+
+def encode_png(img: Image.Image) -> bytes:
+    with span("encode"):
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+def _archive_of(path: str) -> ArchiveWriter | None:
+    parent = os.path.dirname(path)
+    for archive in ARCHIVES.values():
+        if archive.path == parent:
+            return archive
+    return None
+
+
+def output_path(directory: str, pixel_id: str) -> str:
+    """Where write_output() puts an image, a member path for archived final images"""
+    name = f"{pixel_id}.png"
+    archive = ARCHIVES.get(directory)
+    if archive is not None:
+        return archive.member_path(name)
+    return os.path.join(directory, name)
+
+
+def _write_file(path: str, data: bytes):
+    # Replace rather than overwrite, so copies hardlinked to the old file keep their content
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_output(directory: str, pixel_id: str, data: bytes) -> str:
+    """Write an encoded image to its folder, or to the archive for final images"""
+    path = output_path(directory, pixel_id)
+    with span("write", file=os.path.basename(path)):
+        archive = _archive_of(path)
+        if archive is not None:
+            archive.write(os.path.basename(path), data)
+        else:
+            _write_file(path, data)
+        return path
+
+
+def read_output(path: str) -> bytes:
+    archive = _archive_of(path)
+    if archive is not None:
+        return archive.read(os.path.basename(path))
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def reuse_output(src: str, dst: str) -> str:
+    """Give dst the image already written at src, hardlinked when both are plain files"""
+    if src == dst:
+        return dst
+    with span("reuse", file=os.path.basename(dst)):
+        archive = _archive_of(dst)
+        if archive is not None:
+            archive.write(os.path.basename(dst), read_output(src))
+        elif _archive_of(src) is not None:
+            _write_file(dst, read_output(src))
+        elif not (os.path.exists(dst) and os.path.samefile(src, dst)):
+            tmp_path = dst + ".tmp"
+            remove_file(tmp_path)
+            try:
+                os.link(src, tmp_path)
+            except OSError:
+                shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, dst)
+    return dst
+
+
+def output_exists(path: str) -> bool:
+    archive = _archive_of(path)
+    if archive is not None:
+        return os.path.basename(path) in archive
+    return os.path.exists(path)
+
+
+def remove_output(path: str) -> bool:
+    archive = _archive_of(path)
+    if archive is not None:
+        return archive.discard(os.path.basename(path))
+    return remove_file(path)
+
+
+def thumbnail_key(path: str, data: bytes) -> str:
+    """The key contact_sheet.ImageSource gives a freshly written output"""
+    archive = _archive_of(path)
+    if archive is not None:
+        return member_key(archive.path, os.path.basename(path), zlib.crc32(data), len(data))
+    return file_key(path)
+
+
+class OutputRoot:
+    """Where one set's images in one art mode go: final and base image folders, an optional archive and a manifest"""
+
+    def __init__(self, set_key: str, alt_art: bool, final_dir: str, png_dir: str | None, archive_path: str | None, manifest_path: str):
+        self.set_key = set_key
+        self.alt_art = alt_art
+        self.final_dir = final_dir
+        self.png_dir = png_dir
+        self.archive_path = archive_path
+        self.manifest_path = manifest_path
+        self.manifest = None
+        self.archive = None
+        self.unsaved = 0  # cards recorded since the manifest was last saved
+        self.lock = threading.Lock()  # held while the manifest changes or is saved
+
+    def open(self):
+        if self.archive_path is None:
+            os.makedirs(self.final_dir, exist_ok=True)
+        if self.png_dir is not None:
+            os.makedirs(self.png_dir, exist_ok=True)
+        if self.archive_path is not None:
+            self.archive = ARCHIVES[self.final_dir] = ArchiveWriter(self.archive_path)
+        self.manifest = load_manifest(self.manifest_path)
+
+    def close(self):
+        if self.archive is not None:
+            ARCHIVES.pop(self.final_dir, None)
+            self.archive.close()
+            print(f"📦 Wrote {self.archive_path}")
+            self.archive = None
+
+    def output_paths(self, card: Card, plan: list[tuple[str, str]]) -> list[str]:
+        """Paths of a card's outputs in the order the pipeline writes them"""
+        pixel_id = card.pixelborn_id("c")
+        paths = [output_path(self.final_dir, pixel_id)]
+        if self.png_dir is not None:
+            paths.insert(0, output_path(self.png_dir, pixel_id))
+        return paths + [output_path(self.final_dir, variant_id) for variant_id, _ in plan]
+
+
+def output_dirs(set_key: str = DEFAULT_SET, alt_root: bool = False) -> tuple[str, str]:
+    """(final dir, base image dir) of a set, the alt art pair for the alt root"""
+    style = SET_STYLES[set_key]
+    if alt_root:
+        return style["alt_final_dir"], style["alt_png_dir"]
+    return style["final_dir"], style["png_dir"]
+
+
+def archive_path_for(set_key: str = DEFAULT_SET, alt_root: bool = False) -> str:
+    return f"{output_dirs(set_key, alt_root)[0]}.zip"
+
+
+def manifest_path_for(archive: bool, alt_root: bool = False, set_key: str = DEFAULT_SET) -> str:
+    if archive:
+        return archive_path_for(set_key, alt_root) + ".manifest.json"
+    return f"{output_dirs(set_key, alt_root)[0]}.manifest.json"
+
+
+def output_roots(alt_art: bool = False, archive: bool = False, both_art: bool = False, sets=(DEFAULT_SET,),
+                 base_images: bool = True) -> list[OutputRoot]:
+    """Per set, the normal root, holding alt art when alt_art is set, plus the alt root when both_art is"""
+    roots = []
+    for set_key in sets:
+        for alt_root in (False, True) if both_art else (False,):
+            final_dir, png_dir = output_dirs(set_key, alt_root)
+            roots.append(OutputRoot(set_key, alt_root or (alt_art and not both_art), final_dir, png_dir if base_images else None,
+                                    archive_path_for(set_key, alt_root) if archive else None,
+                                    manifest_path_for(archive, alt_root, set_key)))
+    return roots
+
+
+def interleave_sets(entries: list[dict]) -> list[dict]:
+    """Alternate between the sets' entries, each set kept in config order"""
+    by_set = {}
+    for entry in entries:
+        by_set.setdefault(entry["id"].split("-")[0], []).append(entry)
+    queues = list(by_set.values())
+    return [queue[i] for i in range(max(map(len, queues), default=0)) for queue in queues if i < len(queue)]
+
+
+# === Streaming render pipeline ===
+class RenderTarget:
+    """A card in one output root"""
+
+    def __init__(self, root: OutputRoot):
+        self.root = root
+        self.inputs = None
+        self.unit = None
+        self.skipped = False
+
+
+class RenderUnit:
+    """One source art of a card, rendered once for every root that uses it"""
+
+    def __init__(self, seq: int, card_id: str, data: bytes, source_hash: str):
+        self.seq = seq
+        self.card_id = card_id
+        self.data = data
+        self.source_hash = source_hash
+        self.image = None
+        self.modified = None
+        self.render_key = None
+        self.reuse_from = None  # (root, card) whose outputs this one duplicates
+        self.reuse_unit = None  # ...or the unit rendering them in this run
+        self.outputs = None  # paths the images were first written to
+
+
+class RenderJob:
+    """A card on its way through the render pipeline"""
+
+    def __init__(self, seq: int, entry: dict, roots: list[OutputRoot]):
+        self.seq = seq
+        self.entry = entry
+        self.card = Card.from_dict(entry)
+        self.targets = [RenderTarget(root) for root in roots if root.set_key == self.card.style_key]
+        self.units = []
+        self.plan = []
+        self.expected = None  # number of outputs, known once planned
+        self.encoded = {}
+        self.timings = []  # CPU seconds spent on the card by each stage, network aside
+        self.failed = False
+        self.done = False
+        self.flushed = False
+
+
+class RenderOutput:
+    """One image of a card, first as pixels and then as PNG bytes"""
+
+    def __init__(self, job: RenderJob, unit: int, index: int, final: bool, pixel_id: str, image: Image.Image,
+                 variant: str | None = None):
+        self.job = job
+        self.unit = unit
+        self.index = index
+        self.final = final  # a final image rather than the plain resized art
+        self.pixel_id = pixel_id
+        self.image = image  # for a variant, the modified image it's drawn on
+        self.variant = variant
+        self.data = None
+        self.thumbnail = None
+
+
+def static_cost(card: Card) -> float:
+    return BASE_RENDER_COST + sum(VARIANT_COSTS.get(variant, 1.0) for _, variant in card.variant_plan())
+
+
+def schedule_longest_first(entries: list[dict], roots: list[OutputRoot], renderer_hash: str, history: bool = True) -> list[dict]:
+    """Entries ordered by estimated render cost, most expensive first.
+
+    Cards whose manifest records suggest they're up to date cost next to
+    nothing and go last. With history, a card's recorded render time is
+    used where there is one, and the static estimates of the others are
+    scaled to seconds by the typical time per cost unit. Without it the
+    order only depends on the config, which keeps archives reproducible.
+    """
+    records = {}
+    for root in roots:
+        for card_id, record in root.manifest["cards"].items():
+            records.setdefault(card_id, []).append(record)
+
+    cards = [Card.from_dict(entry) for entry in entries]
+    static = [static_cost(card) for card in cards]
+    seconds = [None] * len(cards)
+    if history:
+        for i, card in enumerate(cards):
+            timed = [record["seconds"] for record in records.get(card.id, []) if "seconds" in record]
+            if timed:
+                seconds[i] = max(timed)
+    ratios = [s / c for s, c in zip(seconds, static) if s is not None]
+    per_unit = statistics.median(ratios) if ratios else 1.0
+
+    def cost(i):
+        entry_hash = hash_entry(entries[i])
+        card_records = records.get(cards[i].id, [])
+        if card_records and len(card_records) == sum(1 for root in roots if root.set_key == cards[i].style_key) and all(
+                record["inputs"].get("entry") == entry_hash and record["inputs"].get("renderer") == renderer_hash
+                for record in card_records):
+            return 0.0  # most likely up to date, only the download is left
+        return seconds[i] if seconds[i] is not None else static[i] * per_unit
+
+    order = sorted(range(len(entries)), key=cost, reverse=True)
+    return [entries[i] for i in order]
+
+
+def render_cards(entries: list[dict], roots: list[OutputRoot], renderer_hash: str) -> dict:
+    """Render entries through fetch -> decode -> resize -> plan -> render -> encode -> write.
+
+    At most INFLIGHT_CARDS cards are held in memory at once, so memory stays
+    flat however big the set is. Outputs are written in the order of
+    entries, which keeps the archive reproducible as long as that order is.
+
+    Every root of the card's set gets its images for the root's art mode. The art is
+    downloaded once per card and each distinct source is rendered once, so
+    a card without alt art renders a single time and is linked into the
+    other root. Once decoded, a source whose pixels, keywords and rarity
+    match a card rendered earlier (this run or a previous one, in any root
+    of any set with the same icon strokes)
+    reuses that card's images instead of rendering them again. Returns
+    counts of rendered, skipped, reused and removed cards per root and of
+    reused images.
+    """
+    budget = threading.BoundedSemaphore(INFLIGHT_CARDS)
+    pending = {}
+    stats = {"next_seq": 0, "rendered": 0, "skipped": 0, "reused": 0, "reused_images": 0, "linked": 0, "removed": 0}
+
+    # Render key -> (root, card) recorded with it, and units rendering a key this run
+    renders = {}
+    for root in roots:
+        for card_id, record in root.manifest["cards"].items():
+            if "render" in record:
+                renders[record["render"]] = (root, card_id)
+    claimed = {}
+    dedup_lock = threading.Lock()
+    base_images = all(root.png_dir is not None for root in roots)
+
+    def jobs():
+        for seq, entry in enumerate(entries):
+            # Slots are taken in order, so the oldest card always has one
+            budget.acquire()
+            yield RenderJob(seq, entry, roots)
+
+    def fetch(job):
+        if not job.targets:
+            print(f"✘ No output folder for {job.card.id}")
+            job.failed = job.done = True
+            yield job
+            return
+        need_alt = any(target.root.alt_art for target in job.targets)
+        need_normal = not all(target.root.alt_art for target in job.targets)
+        if need_alt and need_normal:
+            normal, alt, alt_ok = job.card.download_art_pair()
+            if not alt_ok:
+                print(f"⚠️  Skipping the alt art of {job.card.id}, it will render next time")
+                job.targets = [target for target in job.targets if not target.root.alt_art]
+            alt = alt or normal
+        else:
+            normal = alt = job.card.download_image_bytes(alt_art=need_alt)
+        if normal is None or alt is None:
+            job.failed = job.done = True
+            yield job
+            return
+
+        units = {}
+        for target in job.targets:
+            data = alt if target.root.alt_art else normal
+            source_hash = hash_bytes(data)
+            target.inputs = {
+                "entry": hash_entry(job.entry),
+                "source": source_hash,
+                "alt_art": target.root.alt_art,
+                "renderer": renderer_hash,
+                "base_images": base_images,
+            }
+            if not FORCE_REBUILD and is_up_to_date(target.root.manifest["cards"].get(job.card.id), target.inputs, output_exists):
+                target.skipped = True
+                continue
+            if source_hash not in units:
+                units[source_hash] = RenderUnit(job.seq, job.card.id, data, source_hash)
+            target.unit = units[source_hash]
+        job.units = list(units.values())
+        if not job.units:
+            job.done = True
+        yield job
+
+    def recorded_outputs(root, card_id, render_key):
+        record = root.manifest["cards"].get(card_id)
+        if record is None or record.get("render") != render_key or not all(output_exists(path) for path in record["outputs"]):
+            return None
+        if record["inputs"].get("base_images", True) != base_images:
+            return None  # a different set of outputs
+        return record["outputs"]
+
+    def find_duplicate(job, unit):
+        """Point the unit at a card with the same render key, or claim the key for it"""
+        with dedup_lock:
+            owner = claimed.get(unit.render_key)
+            # Decoding runs in parallel, only an earlier card is sure to be written first
+            if owner is not None and owner.seq <= unit.seq:
+                unit.reuse_unit = owner
+                return
+            # Forcing redoes every image on disk, only cards rendered in this run are reused
+            if not FORCE_REBUILD:
+                # The card's own images first, e.g. alt art that fell back to the normal art
+                candidates = [(target.root, job.card.id) for target in job.targets]
+                if unit.render_key in renders:
+                    candidates.append(renders[unit.render_key])
+                for root, card_id in candidates:
+                    if recorded_outputs(root, card_id, unit.render_key) is not None:
+                        unit.reuse_from = (root, card_id)
+                        return
+            claimed[unit.render_key] = unit
+
+    def decode(job):
+        if not job.done:
+            for unit in job.units:
+                with span("decode", card=job.card.id):
+                    unit.image = decode_image(unit.data, DECODED, unit.source_hash)
+                unit.data = None
+                with span("hash_pixels", card=job.card.id):
+                    pixels_hash = f"{unit.image.width}x{unit.image.height}:{hash_bytes(unit.image.tobytes())}"
+                unit.render_key = job.card.render_key(pixels_hash, renderer_hash)
+                find_duplicate(job, unit)
+                if unit.reuse_from is not None or unit.reuse_unit is not None:
+                    unit.image = None
+            if all(unit.image is None for unit in job.units):
+                job.done = True
+        yield job
+
+    def resize(job):
+        if not job.done:
+            for unit in job.units:
+                if unit.image is not None:
+                    unit.image = job.card.resize_and_pad(unit.image)
+        yield job
+
+    def plan(job):
+        if not job.done:
+            job.plan = job.card.variant_plan()
+            rendering = [unit for unit in job.units if unit.image is not None]
+            for unit in rendering:
+                with span("modifications", card=job.card.id):
+                    unit.modified = job.card.apply_modifications(unit.image.copy())
+            job.expected = len(rendering) * (1 + base_images + len(job.plan))
+        yield job
+
+    def render(job):
+        if job.done:
+            yield job
+            return
+        pixel_id = job.card.pixelborn_id("c")
+        for u, unit in enumerate(job.units):
+            if unit.image is None:
+                continue
+            image, modified = unit.image, unit.modified
+            unit.image = unit.modified = None
+            if base_images:
+                yield RenderOutput(job, u, 0, False, pixel_id, image)
+            yield RenderOutput(job, u, 1, True, pixel_id, modified)
+            # Variants are drawn by the encode workers, so a heavy card is spread over all of them
+            for index, (variant_id, variant) in enumerate(job.plan, start=2):
+                yield RenderOutput(job, u, index, True, variant_id, modified, variant)
+
+    def encode(item):
+        if isinstance(item, RenderOutput):
+            if item.variant is not None:
+                item.image = item.job.card.render_variant(item.image, item.variant)
+            if THUMBNAILS is not None and item.final:
+                item.thumbnail = make_thumbnail(item.image, THUMBNAILS.size)
+            item.data = encode_png(item.image)
+            item.image = None
+        yield item
+
+    def timed(fn):
+        """Count the stage's time towards the card's recorded render time"""
+        def stage(item):
+            # CPU time of this thread, wall time would count waiting on the other workers
+            start = time.thread_time()
+            outputs = list(fn(item))
+            job = item.job if isinstance(item, RenderOutput) else item
+            job.timings.append(time.thread_time() - start)
+            return outputs
+        return stage
+
+    def write_unit(job, unit, target):
+        """Write a freshly rendered unit's images to the target's root"""
+        outputs = []
+        for (u, _), out in sorted(job.encoded.items()):
+            if job.units[u] is not unit:
+                continue
+            path = write_output(target.root.final_dir if out.final else target.root.png_dir, out.pixel_id, out.data)
+            if out.thumbnail is not None:
+                THUMBNAILS.put(thumbnail_key(path, out.data), out.thumbnail)
+            outputs.append(path)
+        return outputs
+
+    def flush_target(job, target):
+        unit = target.unit
+        pixel_id = job.card.pixelborn_id("c")
+        if unit.outputs is not None:
+            # Already written to another root for this card, e.g. it has no alt art
+            sources, message = unit.outputs, f"🔗 Linked into {target.root.final_dir}: {pixel_id}.png"
+        elif unit.reuse_unit is not None or unit.reuse_from is not None:
+            if unit.reuse_unit is not None:
+                origin, sources = unit.reuse_unit.card_id, unit.reuse_unit.outputs
+            else:
+                # The card may have been re-rendered differently since it was matched
+                origin, sources = unit.reuse_from[1], recorded_outputs(*unit.reuse_from, unit.render_key)
+            if sources is None:
+                print(f"⚠️  {job.card.id} duplicates {origin}, which changed or failed this run. It will render next time")
+                return
+            if unit.reuse_from == (target.root, job.card.id):
+                message = f"♻️  Unchanged pixels: {pixel_id}.png"
+            else:
+                message = f"♻️  Reused {origin}: {pixel_id}.png"
+        else:
+            sources = None
+
+        if sources is None:
+            outputs = write_unit(job, unit, target)
+            stats["rendered"] += 1
+            print(f"✅ Saved: {pixel_id}.png")
+        else:
+            outputs = [reuse_output(src, dst) for src, dst in zip(sources, target.root.output_paths(job.card, job.card.variant_plan()))]
+            stats["reused"] += 1
+            stats["reused_images"] += len(outputs)
+            stats["linked"] += sum(1 for src, dst in zip(sources, outputs) if src != dst)
+            print(message)
+        if unit.outputs is None:
+            unit.outputs = outputs
+
+        seconds = round(sum(job.timings), 3) if sources is None else None
+        root = target.root
+        with root.lock:
+            stats["removed"] += record_card(root.manifest, job.card.id, target.inputs, outputs, remove_output, unit.render_key, seconds)
+            root.unsaved += 1
+            if root.unsaved >= MANIFEST_SAVE_EVERY:
+                # Often enough that a crash loses little, rarely enough that a big set isn't quadratic
+                save_manifest(root.manifest_path, root.manifest)
+                root.unsaved = 0
+        with dedup_lock:
+            renders.setdefault(unit.render_key, (root, job.card.id))
+
+    def flush(job):
+        job.flushed = True
+        try:
+            for target in job.targets:
+                if target.skipped:
+                    stats["skipped"] += 1
+                elif not job.failed:
+                    flush_target(job, target)
+        except Exception as e:
+            print(f"✘ Error writing {job.card.id}: {e}")
+        finally:
+            job.encoded = {}
+            job.card.release_layers()
+            budget.release()
+
+    def write(item):
+        job = item.job if isinstance(item, RenderOutput) else item
+        if job.flushed:
+            return ()
+        if isinstance(item, RenderOutput):
+            job.encoded[(item.unit, item.index)] = item
+            if len(job.encoded) == job.expected:
+                job.done = True
+        if job.done:
+            pending[job.seq] = job
+        while stats["next_seq"] in pending:
+            next_job = pending.pop(stats["next_seq"])
+            stats["next_seq"] += 1
+            flush(next_job)
+        return ()
+
+    def fail(stage_name, item, exc):
+        job = item.job if isinstance(item, RenderOutput) else item
+        print(f"✘ Error rendering {job.card.id} ({stage_name}): {exc}")
+        job.failed = job.done = True
+        return (job,)
+
+    run_pipeline(jobs(), [
+        Stage("fetch", fetch, FETCH_WORKERS, fail),
+        Stage("decode", timed(decode), RENDER_WORKERS, fail),
+        Stage("resize", timed(resize), RENDER_WORKERS, fail),
+        Stage("plan", timed(plan), 1, fail),
+        Stage("render", render, RENDER_WORKERS, fail),
+        Stage("encode", timed(encode), RENDER_WORKERS, fail),
+        Stage("write", write, 1),
+    ], queue_size=2)
+    return stats
+
+
+def sort_config_file(path: str = CONFIG_PATH):
+    """Sort the config by card number and report duplicate IDs"""
+    entries = load_catalog(path)
 
-print("==== Card Tagging Tool ====")
-print("1. Normal art")
-print("2. Alt art")
-print("3. Sort JSON file")
-choice = input("Choose option: ").strip()
-
-if choice == "1":
-    ALT_ART = False
-elif choice == "2":
-    ALT_ART = True
-elif choice == "3":
-    # Sort the JSON file
-    with open(CONFIG_PATH, "r") as f:
-        entries = json.load(f)
-    
     # Check for duplicates
     seen_ids = {}
     duplicates = []
@@ -496,34 +1181,119 @@ elif choice == "3":
             duplicates.append(card_id)
         else:
             seen_ids[card_id] = True
-    
+
     if duplicates:
         print(f"⚠️  Found {len(duplicates)} duplicate cards: {duplicates}")
-    
+
     def sort_config(config):
         def card_sort_key(entry):
             # Extract numeric part from "OGN-001" -> 1
             return int(entry["id"].split("-")[1])
         return sorted(config, key=card_sort_key)
-    
-    sorted_entries = sort_config(entries)
-    
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(sorted_entries, f, indent=4)
-    
-    print(f"✅ Sorted {len(sorted_entries)} cards in {CONFIG_PATH}")
-    exit()
-else:
-    ALT_ART = False
 
+    sorted_entries = sort_config(entries)
 
-SPECIFIC_CARDS = [150, 231] 
+    save_catalog(path, sorted_entries)
+
+    print(f"✅ Sorted {len(sorted_entries)} cards in {path}")
+
+
+def load_entries(path: str = CONFIG_PATH) -> list[dict]:
+    return load_catalog(path)
+
+
+def load_set_entries(sets=RENDER_SETS) -> list[dict]:
+    """The config entries of every set, one set after another"""
+    entries = []
+    for set_key in sets:
+        entries += load_entries(SET_STYLES[set_key]["config"])
+    return entries
+
+
+def render(entries: list[dict], alt_art: bool = False, archive: bool = False, force: bool = False, full_build: bool = True,
+           thumbnails=None, both_art: bool = False, base_images: bool | None = None):
+    """Incrementally render entries.
+
+    Every output is recorded with the inputs that produced it, so a rerun only
+    re-renders cards whose config entry, source art, art mode or renderer
+    changed. Pass full_build=False for a partial selection so cards outside
+    it are not pruned. Pass a contact_sheet.ThumbnailCache as thumbnails to
+    fill it from the rendered images. With both_art the normal art goes to
+    ImagesFinal and the alt art to ImagesFinalAlt in the same pass.
+
+    Entries may come from several sets. Each set renders into its own
+    folders (see SET_STYLES), with the sets' cards interleaved in one
+    pipeline so downloads, icons and workers are shared.
+
+    base_images=False skips ImagesPNG, defaulting to WRITE_BASE_IMAGES.
+    Decoded art is cached when CACHE_DECODED is set.
+    """
+    global ALT_ART, FORCE_REBUILD, THUMBNAILS, DECODED
+    ALT_ART = alt_art
+    FORCE_REBUILD = force
+    THUMBNAILS = thumbnails
+    DECODED = DecodeCache() if CACHE_DECODED else None
+    if base_images is None:
+        base_images = WRITE_BASE_IMAGES
+
+    sets = list(dict.fromkeys(Card.from_dict(entry).style_key for entry in entries))
+    roots = output_roots(alt_art, archive, both_art, sets, base_images)
+    renderer_hash = str(RENDERER_VERSION)
+
+    try:
+        for root in roots:
+            root.open()
+        order = interleave_sets(entries)
+        if SCHEDULE_LONGEST_FIRST:
+            order = schedule_longest_first(order, roots, renderer_hash, history=not archive)
+        stats = render_cards(order, roots, renderer_hash)
+
+        for root in roots:
+            if full_build:
+                # Only a full build knows which cards left the config
+                kept = [entry["id"] for entry in entries if Card.from_dict(entry).style_key == root.set_key]
+                stats["removed"] += prune_manifest(root.manifest, kept, remove_output)
+    finally:
+        for root in roots:
+            if root.manifest is not None:
+                # Also when interrupted, so the cards already written aren't rendered again
+                with root.lock:
+                    save_manifest(root.manifest_path, root.manifest)
+            root.close()
+        THUMBNAILS = None
+        if DECODED is not None:
+            DECODED.trim()
+
+    if stats["reused"]:
+        print(f"♻️  {stats['reused']} renders matched art already rendered: skipped rendering and encoding "
+              f"{stats['reused_images']} images, {stats['linked']} of them linked or copied")
+    if DECODED is not None and DECODED.hits:
+        print(f"🧊 {DECODED.hits} of {DECODED.hits + DECODED.misses} images came decoded from {DECODED.directory}")
+    per_root = f" across {len(roots)} output folders" if len(roots) > 1 else ""
+    print(f"🏁 Rendered {stats['rendered']} cards, {stats['skipped']} up to date, {stats['reused']} reused, "
+          f"removed {stats['removed']} orphaned files{per_root}")
+
+
+def main(sets=None):
+    """Interactive menu, rendering the sets in RENDER_SETS unless given others"""
+    sets = sets or RENDER_SETS
+    print("==== Card Tagging Tool ====")
+    print("1. Normal art")
+    print("2. Alt art")
+    print("3. Sort JSON file")
+    print(f"4. Normal and alt art in one pass (alt art goes to {', '.join(output_dirs(set_key, alt_root=True)[0] for set_key in sets)})")
+    choice = input("Choose option: ").strip()
+
+    if choice == "3":
+        for set_key in sets:
+            sort_config_file(SET_STYLES[set_key]["config"])
+        return
+    alt_art = choice == "2"
+    both_art = choice == "4"
+
+    # === Load config and process cards ===
+    entries = load_set_entries(sets)
 
-from collections import Counter
-# === Load config and process cards ===
-with open(CONFIG_PATH, "r") as f:
-    entries = json.load(f)
-    
     # Filter entries to only include specific card numbers
     if len(SPECIFIC_CARDS) >= 1:
         filtered_entries = []
@@ -537,14 +1307,9 @@ with open(CONFIG_PATH, "r") as f:
     else:
         print(f"Processing all {len(entries)} cards")
 
-    # Find duplicates
-    ids = [entry["id"] for entry in entries]
-    id_counts = Counter(ids)
-    duplicates = [card_id for card_id, count in id_counts.items() if count > 1]
-
-    cards = [Card.from_dict(entry) for entry in entries]
+    render(entries, alt_art=alt_art, archive=ARCHIVE_OUTPUT, force=FORCE_REBUILD, full_build=not SPECIFIC_CARDS, both_art=both_art)
 
-for card in cards:
-    card.process()
+if __name__ == "__main__":
+    main()
 
 # https://lucide.dev/icons/
\ No newline at end of file
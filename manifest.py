@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+
+MANIFEST_FORMAT = 1
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_entry(entry: dict) -> str:
+    """Hash a config entry. Keywords are sorted first, their order doesn't change the render"""
+    if isinstance(entry.get("keywords"), list):
+        entry = dict(entry, keywords=sorted(entry["keywords"]))
+    return hash_bytes(json.dumps(entry, sort_keys=True).encode("utf-8"))
+
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hash_bytes(f.read())
+
+
+def load_manifest(path: str) -> dict:
+    """Load the build manifest, or start an empty one if missing or outdated"""
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("format") == MANIFEST_FORMAT:
+            return manifest
+        print(f"⚠️  Ignoring manifest with old format: {path}")
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        print(f"⚠️  Ignoring unreadable manifest {path}: {e}")
+    return {"format": MANIFEST_FORMAT, "cards": {}}
+
+
+def save_manifest(path: str, manifest: dict):
+    """Write the manifest atomically so a crash never leaves it half written"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(record: dict | None, inputs: dict, exists=os.path.exists) -> bool:
+    """A card is up to date if its inputs match and every recorded output still exists"""
+    if record is None or record.get("inputs") != inputs:
+        return False
+    return all(exists(path) for path in record.get("outputs", []))
+
+
+def remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def remove_outputs(paths, remove=remove_file) -> int:
+    return sum(1 for path in paths if remove(path))
+
+
+def record_card(manifest: dict, card_id: str, inputs: dict, outputs: list[str], remove=remove_file, render_key: str | None = None,
+                seconds: float | None = None) -> int:
+    """Store a fresh render and delete outputs the card no longer produces.
+
+    render_key identifies the pixels of the outputs regardless of card, so
+    later cards with the same key can reuse them. seconds is how long the
+    render took, used to schedule the card next time.
+    """
+    old = manifest["cards"].get(card_id)
+    stale = []
+    if old is not None:
+        stale = [path for path in old.get("outputs", []) if path not in outputs]
+    manifest["cards"][card_id] = {"inputs": inputs, "outputs": outputs}
+    if render_key is not None:
+        manifest["cards"][card_id]["render"] = render_key
+    if seconds is not None:
+        manifest["cards"][card_id]["seconds"] = seconds
+    return remove_outputs(stale, remove)
+
+
+def prune_manifest(manifest: dict, live_ids, remove=remove_file) -> int:
+    """Drop cards that left the config and delete their outputs"""
+    live_ids = set(live_ids)
+    removed = 0
+    for card_id in [card_id for card_id in manifest["cards"] if card_id not in live_ids]:
+        removed += remove_outputs(manifest["cards"].pop(card_id).get("outputs", []), remove)
+    return removed
@@ -1,9 +1,21 @@
-import json5 as json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from catalog import load_catalog, save_catalog
+from catalog_db import CatalogDB
 
 CONFIG_FILE = "scraped_cards.json5"
+CATALOG_DB = None  # e.g. "scraped_cards.sqlite3" to store every edit in SQLite as it happens
 MAX_CARD_ID = 298
 
+# Range tagging downloads the next cards in the background and saves a
+# preview of each, so moving to the next card never waits on the network
+PREFETCH_AHEAD = 3
+PREVIEW_DIR = "previews"
+PREVIEW_HEIGHT = 768
+SUGGESTIONS_FILE = "scraped_cards_tester.json5"  # auto_config scan results
+
 KEYWORD_MENU = {
     "1": "unit",
     "2": "spell",
@@ -18,6 +30,7 @@ KEYWORD_MENU = {
     "11": "legend",
     "12": "champunit",
     "13": "token",
+    "s": "use suggestion",
     "v": "next",
     "q": "quit"
 }
@@ -34,20 +47,113 @@ RARITY_MAP = {
 
 
 def load_config():
+    if CATALOG_DB:
+        db = CatalogDB(CATALOG_DB)
+        if db.sync_json5(CONFIG_FILE):
+            print(f"📥 Imported {CONFIG_FILE} into {CATALOG_DB}")
+            kept = db.unexported()
+            if kept:
+                print(f"⚠️  Kept {len(kept)} unsaved edits over the changed {CONFIG_FILE}: {', '.join(kept)}")
+        return db
     if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
+        return load_catalog(CONFIG_FILE)
     return []
 
 
 def save_config(config):
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+    if isinstance(config, CatalogDB):
+        config.export_json5(CONFIG_FILE)
+    else:
+        save_catalog(CONFIG_FILE, config)
     print(f"💾 Config saved to {CONFIG_FILE}")
 
 
-def tag_single(card_id, config):
+def fetch_preview(card_id):
+    """Download a card and save a small preview, returning its path"""
+    path = os.path.join(PREVIEW_DIR, f"{card_id}.png")
+    if os.path.exists(path):
+        return path
+
+    import requests
+    from PIL import Image
+    import pillow_avif
+
+    set_key = card_id.split("-")[0]
+    url = f"https://cdn.rgpub.io/public/live/map/riftbound/latest/{set_key}/cards/{card_id}/full-desktop-2x.avif"
+    response = requests.get(url, timeout=10)
+    if response.status_code != 200:
+        return None
+    image = Image.open(BytesIO(response.content)).convert("RGB")
+    image.thumbnail((PREVIEW_HEIGHT, PREVIEW_HEIGHT))
+    os.makedirs(PREVIEW_DIR, exist_ok=True)
+    image.save(path)
+    return path
+
+
+class Prefetcher:
+    """Fetches previews for upcoming cards in the background"""
+
+    def __init__(self, workers=PREFETCH_AHEAD):
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.futures = {}
+
+    def schedule(self, card_ids):
+        for card_id in card_ids:
+            if card_id not in self.futures:
+                self.futures[card_id] = self.pool.submit(fetch_preview, card_id)
+
+    def show(self, card_id):
+        """Print the preview path if it's ready, never blocks"""
+        future = self.futures.get(card_id)
+        if future is None or not future.done():
+            print("⏳ Preview still downloading")
+        elif future.exception() is not None:
+            print(f"✘ Preview failed: {future.exception()}")
+        elif future.result() is None:
+            print("✘ No image found for preview")
+        else:
+            print(f"🖼️  Preview: {os.path.abspath(future.result())}")
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_suggestions = None
+
+
+def get_suggestion(card_id):
+    """Scan result for a card from SUGGESTIONS_FILE, loaded once per session"""
+    global _suggestions
+    if _suggestions is None:
+        try:
+            _suggestions = {entry["id"]: entry for entry in load_catalog(SUGGESTIONS_FILE)}
+        except FileNotFoundError:
+            _suggestions = {}
+    return _suggestions.get(card_id)
+
+
+def find_entry(card_id, config):
+    if isinstance(config, CatalogDB):
+        return config.get(card_id)
+    return next((entry for entry in config if entry["id"] == card_id), None)
+
+
+def tag_single(card_id, config, prefetcher=None):
     print(f"\n📝 Tagging card: {card_id}")
+    if prefetcher is not None:
+        prefetcher.show(card_id)
+    current = find_entry(card_id, config)
+    if current is not None:
+        print(f"📄 Current: {current.get('keywords', [])} [{current.get('rarity', '')}]")
+    suggestion = get_suggestion(card_id)
+    if suggestion is not None:
+        print(f"💡 Scan suggests: {suggestion.get('keywords', [])} [{suggestion.get('rarity', '')}]")
     keywords = []
 
     while True:
@@ -62,6 +168,14 @@ def tag_single(card_id, config):
             save_config(config)
             print("👋 Exiting early.")
             exit()
+        elif choice == "s":
+            if suggestion is None:
+                print("❌ No suggestion for this card.")
+                continue
+            for kw in suggestion.get("keywords", []):
+                if kw not in keywords:
+                    keywords.append(kw)
+            print("Keywords: ", keywords)
         elif choice in KEYWORD_MENU:
             kw = KEYWORD_MENU[choice]
             if kw not in keywords:
@@ -88,6 +202,9 @@ def tag_single(card_id, config):
 
     # Update config
     new_entry = {"id": card_id, "keywords": keywords, "rarity": rarity}
+    if isinstance(config, CatalogDB):
+        config.upsert(new_entry)  # committed straight away
+        return config
     for i, entry in enumerate(config):
         if entry["id"] == card_id:
             config[i] = new_entry
@@ -99,9 +216,11 @@ def tag_single(card_id, config):
 
 
 def tag_range(config, start, end):
-    for i in range(start, end + 1):
-        card_id = f"OGN-{i:03}"
-        config = tag_single(card_id, config)
+    card_ids = [f"OGN-{i:03}" for i in range(start, end + 1)]
+    with Prefetcher() as prefetcher:
+        for n, card_id in enumerate(card_ids):
+            prefetcher.schedule(card_ids[n:n + PREFETCH_AHEAD + 1])
+            config = tag_single(card_id, config, prefetcher)
     return config
 
 
@@ -134,6 +253,9 @@ def tag_one(config):
 
 
 def sort_config(config):
+    if isinstance(config, CatalogDB):
+        return config  # always exported in card order
+
     def card_sort_key(entry):
         # Extract numeric part from "OGN-001" -> 1
         return int(entry["id"].split("-")[1])
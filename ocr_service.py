@@ -0,0 +1,385 @@
+"""OCR for the scanners, in-process or from a long-lived local service.
+
+Loading easyocr and its torch model takes seconds, which dwarfs the OCR
+itself when only a card or two is scanned. `python cli.py ocr-serve` starts
+a service that loads the reader and the tap templates once and then
+answers scans over a localhost connection until it is stopped:
+
+    python cli.py ocr-serve          # leave running in another terminal
+    python cli.py scan --ids 42      # uses it, no model load
+
+ocr_engine() connects to the service when it is running and otherwise
+loads the reader in this process. Either way the scanners get the same
+readtext() and find_tap() calls. A service that stops mid-scan is
+replaced by in-process OCR for the rest of the scan.
+
+Crops are sent as raw uint8 pixels with a JSON header, and results come
+back as JSON, so nothing is unpickled on either side.
+
+Text sits at fixed places on the card template, so easyocr's text detector
+is mostly wasted work. Each crop the scanners send names its region
+("type", "rules", ...). `python cli.py ocr-fit` learns each region's line
+boxes from full detection runs on sample cards. It keeps a region's boxes
+only when reading them gives the same words as full detection on every
+sample, and saves them to LINE_BOXES_FILE. From then on, only the
+recognizer runs on those boxes. If any line reads below
+FAST_MIN_CONFIDENCE, or nothing is read, the crop goes through full
+detection instead. Until ocr-fit has run, every crop gets full detection.
+"""
+import json
+import os
+import statistics
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from tracing import span
+
+OCR_ADDRESS = ("127.0.0.1", 47615)
+OCR_AUTHKEY = b"riftbound-ocr"  # keeps other local programs from talking to the service by accident
+OCR_LANGUAGES = ["en"]
+OCR_GPU = True
+TAP_TEMPLATES = ("assets/white_on_black_auto.png", "assets/black_on_white_auto.png")
+TAP_THRESHOLD = 0.8  # template match score that counts as a tap icon
+FAST_PATH = True  # recognize fixed line boxes without running the text detector, once ocr-fit has made LINE_BOXES_FILE
+FAST_MIN_CONFIDENCE = 0.5  # a line read below this sends the crop through full detection
+# Line boxes as (left, right, top, bottom) fractions of the crop, per region,
+# written by ocr-fit. Without the file, or for a region without boxes, OCR
+# runs full detection
+LINE_BOXES_FILE = "ocr_line_boxes.json"
+SAMPLES_DIR = "assets/ocr_samples"  # one crop per fitted region, checked by tests/test_ocr_fast_path.py
+LINE_PAD = 0.02  # added around fitted lines, as a fraction of the crop
+MIN_LINE_SAMPLES = 2  # a fitted line must show up on this many cards
+MAX_LINE_HEIGHT = 1.8  # fitted lines taller than this many median text heights aren't fixed, the region keeps detection
+
+Detection = tuple[list[list[float]], str, float]  # bbox corners, text, confidence
+
+
+@lru_cache(maxsize=1)
+def load_reader():
+    """The easyocr reader, loaded on first use and kept for the life of the process"""
+    import easyocr
+
+    with span("ocr.reader_init"):
+        return easyocr.Reader(OCR_LANGUAGES, gpu=OCR_GPU)
+
+
+@lru_cache(maxsize=1)
+def load_tap_templates() -> tuple[np.ndarray, ...]:
+    import cv2
+
+    templates = tuple(cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in TAP_TEMPLATES)
+    if any(template is None for template in templates):
+        raise FileNotFoundError("WHERE IS TAPPING ICONS")
+    return templates
+
+
+@lru_cache(maxsize=1)
+def load_line_boxes(path: str = LINE_BOXES_FILE) -> dict[str, list[tuple[float, float, float, float]]]:
+    """Line boxes fitted by ocr-fit, none until it has run"""
+    try:
+        with open(path, "r") as f:
+            return {region: [tuple(box) for box in lines] for region, lines in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def words(results: list[Detection]) -> list[str]:
+    """Sorted lowercase words of confident detections, to compare two reads of a crop"""
+    return sorted(" ".join(text for _, text, confidence in results if confidence > FAST_MIN_CONFIDENCE).lower().split())
+
+
+def box_fractions(bbox, width: int, height: int) -> tuple[float, float, float, float]:
+    """(left, right, top, bottom) of a detection's corners, as fractions of its crop"""
+    xs, ys = [x for x, _ in bbox], [y for _, y in bbox]
+    return min(xs) / width, max(xs) / width, min(ys) / height, max(ys) / height
+
+
+def fit_line_boxes(observed: dict[str, list[list[tuple]]]) -> tuple[dict[str, list[tuple]], dict[str, str]]:
+    """Line boxes per region from the boxes full detection found on sample crops.
+
+    Boxes are grouped into lines by their vertical centre, and each line
+    becomes the union of its boxes, padded. Returns the boxes and, for
+    regions left to full detection, why.
+    """
+    fitted, skipped = {}, {}
+    for region, samples in observed.items():
+        boxes = sorted((box + (i,) for i, sample in enumerate(samples) for box in sample), key=lambda box: (box[2] + box[3]) / 2)
+        if not boxes:
+            skipped[region] = "no text found"
+            continue
+        lines = []
+        for left, right, top, bottom, sample in boxes:
+            centre = (top + bottom) / 2
+            if lines and lines[-1]["top"] <= centre <= lines[-1]["bottom"]:
+                line = lines[-1]
+                line.update(left=min(line["left"], left), right=max(line["right"], right),
+                            top=min(line["top"], top), bottom=max(line["bottom"], bottom))
+                line["samples"].add(sample)
+            else:
+                lines.append({"left": left, "right": right, "top": top, "bottom": bottom, "samples": {sample}})
+        lines = [line for line in lines if len(line["samples"]) >= MIN_LINE_SAMPLES]
+        text_height = statistics.median(bottom - top for _, _, top, bottom, _ in boxes)
+        if not lines:
+            skipped[region] = "no line found on enough cards"
+        elif any(line["bottom"] - line["top"] > MAX_LINE_HEIGHT * text_height for line in lines):
+            skipped[region] = "text moves between cards"
+        else:
+            fitted[region] = [(max(0.0, line["left"] - LINE_PAD), min(1.0, line["right"] + LINE_PAD),
+                               max(0.0, line["top"] - LINE_PAD), min(1.0, line["bottom"] + LINE_PAD)) for line in lines]
+    return fitted, skipped
+
+
+def _plain(detection) -> Detection:
+    """easyocr result with numpy numbers turned into JSON-friendly ones"""
+    bbox, text, confidence = detection
+    return [[float(x), float(y)] for x, y in bbox], str(text), float(confidence)
+
+
+class LocalOCR:
+    """OCR in this process. The reader is shared by every LocalOCR, only one thread uses it at a time.
+
+    With record set, the boxes full detection finds are kept per region in
+    observed, for fit_line_boxes(), and each crop with its detections in
+    samples, to check the fitted boxes against.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, fast_path: bool | None = None, record: bool = False):
+        self.fast_path = FAST_PATH if fast_path is None else fast_path
+        self.observed = defaultdict(list) if record else None
+        self.samples = defaultdict(list) if record else None
+        self.stats = {"fast": 0, "full": 0}
+
+    def load(self):
+        """Load the reader and the tap templates now, so a missing model fails before any card is scanned"""
+        print("⏳ Loading the OCR model...")
+        load_reader()
+        load_tap_templates()
+
+    def _recognize(self, reader, crop: np.ndarray, boxes) -> list[Detection] | None:
+        """Text of fixed line boxes, or None when a line isn't read confidently"""
+        height, width = crop.shape[:2]
+        horizontal = [[int(left * width), int(right * width), int(top * height), int(bottom * height)] for left, right, top, bottom in boxes]
+        with span("ocr.recognize", lines=len(horizontal)):
+            results = [_plain(d) for d in reader.recognize(crop, horizontal_list=horizontal, free_list=[])]
+        results = [result for result in results if result[1].strip()]
+        if results and all(confidence >= FAST_MIN_CONFIDENCE for _, _, confidence in results):
+            return results
+        return None
+
+    def readtext(self, crops: list[np.ndarray], regions: list[str | None] | None = None) -> list[list[Detection]]:
+        """Detections per crop. Crops of a region with known line boxes skip detection when they can"""
+        reader = load_reader()
+        line_boxes = load_line_boxes() if self.fast_path else {}
+        found = []
+        with self._lock:
+            for crop, region in zip(crops, regions or [None] * len(crops)):
+                results = None
+                if line_boxes.get(region):
+                    results = self._recognize(reader, crop, line_boxes[region])
+                if results is not None:
+                    self.stats["fast"] += 1
+                else:
+                    with span("ocr.detect_and_recognize", region=region):
+                        results = [_plain(d) for d in reader.readtext(crop)]
+                    self.stats["full"] += 1
+                    if self.observed is not None and region is not None:
+                        height, width = crop.shape[:2]
+                        self.observed[region].append([box_fractions(bbox, width, height) for bbox, _, _ in results])
+                        self.samples[region].append((crop, results))
+                found.append(results)
+        return found
+
+    def find_tap(self, crops: list[np.ndarray]) -> list[bool]:
+        """Whether each RGB crop contains a tap icon"""
+        import cv2
+
+        templates = load_tap_templates()
+        found = []
+        for crop in crops:
+            gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+            with span("ocr.template_match"):
+                found.append(any(cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED).max() >= TAP_THRESHOLD
+                                 for template in templates))
+        return found
+
+
+def _send_crops(conn, op: str, crops: list[np.ndarray], regions: list[str | None] | None = None):
+    crops = [np.ascontiguousarray(crop, dtype=np.uint8) for crop in crops]
+    conn.send_bytes(json.dumps({"op": op, "shapes": [crop.shape for crop in crops], "regions": regions}).encode())
+    for crop in crops:
+        conn.send_bytes(crop.tobytes())
+
+
+def _recv_crops(conn) -> tuple[str, list[np.ndarray], list[str | None] | None]:
+    header = json.loads(conn.recv_bytes())
+    crops = [np.frombuffer(conn.recv_bytes(), dtype=np.uint8).reshape(shape) for shape in header["shapes"]]
+    return header["op"], crops, header.get("regions")
+
+
+class RemoteOCR:
+    """Client of a running OCR service, falling back to LocalOCR if the service goes away"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.fallback = None
+        self._lock = threading.Lock()
+
+    def _call(self, op: str, crops: list[np.ndarray], *args):
+        if self.fallback is None:
+            try:
+                with self._lock, span(f"ocr.remote.{op}", crops=len(crops)):
+                    _send_crops(self.conn, op, crops, *args)
+                    reply = json.loads(self.conn.recv_bytes())
+                if "error" not in reply:
+                    return reply["results"]
+                print(f"⚠️  OCR service failed ({reply['error']}), running this OCR here")
+                return getattr(LocalOCR(), op)(crops, *args)
+            except (OSError, EOFError) as e:
+                print(f"⚠️  Lost the OCR service ({e}), running OCR here for the rest of the scan")
+                self.close()
+                self.fallback = LocalOCR()
+        return getattr(self.fallback, op)(crops, *args)
+
+    def readtext(self, crops: list[np.ndarray], regions: list[str | None] | None = None) -> list[list[Detection]]:
+        detections = self._call("readtext", crops, regions)
+        return [[(bbox, text, confidence) for bbox, text, confidence in found] for found in detections]
+
+    def find_tap(self, crops: list[np.ndarray]) -> list[bool]:
+        return self._call("find_tap", crops)
+
+    def close(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+def connect(address=OCR_ADDRESS) -> RemoteOCR | None:
+    """Client of the OCR service, or None when it isn't running"""
+    try:
+        return RemoteOCR(Client(address, authkey=OCR_AUTHKEY))
+    except (OSError, EOFError):
+        return None
+
+
+_engine = None
+
+
+def ocr_engine() -> LocalOCR | RemoteOCR:
+    """The service if it is running, otherwise in-process OCR with its model loaded. Decided once per process"""
+    global _engine
+    if _engine is None:
+        engine = connect()
+        if engine is not None:
+            print(f"🔤 Using the OCR service at {OCR_ADDRESS[0]}:{OCR_ADDRESS[1]}")
+        else:
+            engine = LocalOCR()
+            engine.load()  # raises here, before _engine is set, when easyocr or the model is missing
+        _engine = engine
+    return _engine
+
+
+def _handle(conn, engine: LocalOCR):
+    with conn:
+        while True:
+            try:
+                op, crops, regions = _recv_crops(conn)
+            except (EOFError, OSError):
+                return  # client finished
+            try:
+                if op == "readtext":
+                    reply = {"results": engine.readtext(crops, regions)}
+                elif op == "find_tap":
+                    reply = {"results": engine.find_tap(crops)}
+                else:
+                    raise ValueError(f"unknown operation {op!r}")
+            except Exception as e:
+                reply = {"error": f"{type(e).__name__}: {e}"}
+            try:
+                conn.send_bytes(json.dumps(reply).encode())
+            except OSError:
+                return
+
+
+def serve(address=OCR_ADDRESS):
+    """Load the reader and templates, then answer clients until interrupted"""
+    engine = LocalOCR()
+    engine.load()
+    with Listener(address, authkey=OCR_AUTHKEY) as listener:
+        print(f"🔤 OCR service listening on {address[0]}:{address[1]}, Ctrl+C to stop")
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # A client with the wrong key or one that hung up during the handshake
+                    print(f"⚠️  Refused a connection: {e}")
+                    continue
+                threading.Thread(target=_handle, args=(conn, engine), daemon=True).start()
+        except KeyboardInterrupt:
+            print(f"🛑 OCR service stopped. {engine.stats['fast']} crops read from fixed line boxes, {engine.stats['full']} with full detection")
+
+
+def save_sample(region: str, crop: np.ndarray, directory: str = SAMPLES_DIR):
+    """Keep a crop of a fitted region, so the fast path can be checked against full detection later"""
+    from PIL import Image
+
+    os.makedirs(directory, exist_ok=True)
+    Image.fromarray(crop).save(os.path.join(directory, f"{region}.png"))
+
+
+def fit_ocr_boxes(scanner, card_nums, path: str = LINE_BOXES_FILE) -> dict[str, list[tuple]]:
+    """Learn each region's line boxes from full detection on the given cards of a scanner module, and save them"""
+    global _engine
+    engine = LocalOCR(fast_path=False, record=True)
+    engine.load()
+    previous, _engine = _engine, engine
+    try:
+        for card_num in card_nums:
+            card = scanner.Card(card_num)
+            image = card.download_image()
+            if image is None:
+                continue
+            try:
+                card.extract_text(image)
+            except Exception as e:
+                print(f"✘ Error reading {card.id}: {e}")
+    finally:
+        _engine = previous
+
+    fitted, skipped = fit_line_boxes(engine.observed)
+    # Only keep boxes whose fast read gives the same words as full detection on every sample card
+    for region, lines in list(fitted.items()):
+        with engine._lock:
+            misread = sum(words(engine._recognize(load_reader(), crop, lines) or []) != words(results)
+                          for crop, results in engine.samples[region])
+        if misread:
+            del fitted[region]
+            skipped[region] = f"fixed lines read differently from full detection on {misread} cards"
+        else:
+            save_sample(region, max(engine.samples[region], key=lambda sample: len(words(sample[1])))[0])
+    try:
+        with open(path, "r") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        saved = {}
+    saved.update(fitted)
+    saved.update((region, []) for region in skipped)  # also drops boxes fitted by an earlier run
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(saved, f, indent=2)
+    os.replace(tmp_path, path)
+    load_line_boxes.cache_clear()
+
+    for region, lines in sorted(fitted.items()):
+        print(f"  {region}: {len(lines)} lines")
+    for region, reason in sorted(skipped.items()):
+        print(f"  {region}: keeps full detection, {reason}")
+    print(f"📐 Fit line boxes for {len(fitted)} regions on {engine.stats['full']} crops to {path}. Restart ocr-serve to use them")
+    return fitted
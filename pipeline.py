@@ -0,0 +1,77 @@
+import queue
+import threading
+
+_END = object()
+
+
+def _report_error(stage_name, item, exc):
+    print(f"✘ {stage_name} failed: {exc}")
+    return ()
+
+
+class Stage:
+    """One step of a pipeline.
+
+    `fn` takes an item and yields any number of items for the next stage.
+    If it raises, `on_error(stage_name, item, exc)` decides what is passed on
+    instead.
+    """
+
+    def __init__(self, name: str, fn, workers: int = 1, on_error=_report_error):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.on_error = on_error
+
+
+def _run_stage(stage: Stage, in_q: queue.Queue, out_q: queue.Queue | None, remaining: list, lock: threading.Lock):
+    while True:
+        item = in_q.get()
+        if item is _END:
+            in_q.put(_END)  # leave it for the other workers of this stage
+            break
+        try:
+            for out in stage.fn(item):
+                if out_q is not None:
+                    out_q.put(out)
+        except Exception as e:
+            for out in stage.on_error(stage.name, item, e):
+                if out_q is not None:
+                    out_q.put(out)
+
+    with lock:
+        remaining[0] -= 1
+        last = remaining[0] == 0
+    if last and out_q is not None:
+        out_q.put(_END)
+
+
+def run_pipeline(source, stages: list[Stage], queue_size: int = 4):
+    """Push every item from `source` through `stages` and wait until all are done.
+
+    Stages run in their own worker threads and are joined by bounded queues,
+    so a slow stage holds back the ones before it instead of letting work
+    pile up in memory. Items leaving the last stage are dropped.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    threads = []
+    for i, stage in enumerate(stages):
+        out_q = queues[i + 1] if i + 1 < len(stages) else None
+        remaining = [stage.workers]
+        lock = threading.Lock()
+        for n in range(stage.workers):
+            thread = threading.Thread(
+                target=_run_stage,
+                args=(stage, queues[i], out_q, remaining, lock),
+                name=f"{stage.name}-{n}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+    for item in source:
+        queues[0].put(item)
+    queues[0].put(_END)
+
+    for thread in threads:
+        thread.join()
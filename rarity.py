@@ -0,0 +1,198 @@
+"""Batch rarity classification from the gem at the bottom of a card.
+
+Each card's rarity band is cropped and box-resized to a small fixed size,
+so the bands of a whole scan stack into one (cards, height, width, 3)
+array. classify() turns that into mean colours and finds the nearest
+centroid for every card in one vectorized pass, a few microseconds per card.
+
+Centroids are fit from the labelled catalogs and saved to CENTROIDS_FILE.
+Without that file the old single-channel thresholds are applied to the same
+batch instead.
+
+    python cli.py rarity-fit
+    python cli.py rarity-fit --catalog scraped_cards.json5 --refresh
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from catalog import load_catalog
+from tracing import span
+
+CENTROIDS_FILE = "rarity_centroids.json"
+FIT_CATALOGS = ("scraped_cards.json5", "scraped_cards_ogs.json5")
+BANDS_CACHE = ".rarity_bands.npz"  # bands of the labelled cards, so refitting needs no downloads
+FIT_WORKERS = 8
+
+RARITY_BOX = (0.49, 0.935, 0.51, 0.95)  # left, top, right, bottom as fractions of the card
+BAND_SIZE = (8, 8)  # width, height every band is resized to
+
+
+def rarity_band(image: Image.Image) -> np.ndarray:
+    """The rarity band of a card as a BAND_SIZE uint8 RGB array"""
+    width, height = image.size
+    left, top, right, bottom = RARITY_BOX
+    box = (int(width * left), int(height * top), int(width * right), int(height * bottom))
+    band = image.resize(BAND_SIZE, Image.Resampling.BOX, box=box)
+    if band.mode != "RGB":
+        band = band.convert("RGB")
+    return np.asarray(band, dtype=np.uint8)
+
+
+def band_features(bands) -> np.ndarray:
+    """Mean RGB of each band, (cards, 3) float32"""
+    bands = np.asarray(bands)
+    return bands.reshape(len(bands), -1, 3).mean(axis=1, dtype=np.float32)
+
+
+def threshold_rarities(bands) -> list[str]:
+    """The hand-tuned single-channel rules, applied to a whole batch"""
+    features = band_features(bands)
+    labels = np.full(len(features), "common", dtype=object)
+    labels[features[:, 0] < 135] = "uncommon"
+    labels[features[:, 1] < 115] = "rare"
+    labels[features[:, 2] < 85] = "epic"
+    return labels.tolist()
+
+
+class RarityClassifier:
+    """Nearest centroid over mean band colour, scaled by the spread of each channel"""
+
+    def __init__(self, labels: list[str], centroids, scale):
+        self.labels = list(labels)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self._scaled = self.centroids / self.scale
+
+    @classmethod
+    def fit(cls, bands, labels: list[str]) -> "RarityClassifier":
+        features = band_features(bands)
+        labels = np.asarray(labels)
+        classes = sorted(set(labels.tolist()))
+        centroids = np.stack([features[labels == label].mean(axis=0) for label in classes])
+        # Pooled within-class spread, so no channel dominates the distance
+        residuals = features - centroids[np.searchsorted(classes, labels)]
+        scale = np.maximum(residuals.std(axis=0), 1.0)
+        return cls(classes, centroids, scale)
+
+    def distances(self, bands) -> np.ndarray:
+        """Squared scaled distance of every band to every centroid, (cards, classes)"""
+        scaled = band_features(bands) / self.scale
+        return ((scaled[:, None, :] - self._scaled[None, :, :]) ** 2).sum(axis=2)
+
+    def classify(self, bands) -> list[str]:
+        if len(bands) == 0:
+            return []
+        nearest = self.distances(bands).argmin(axis=1)
+        return [self.labels[i] for i in nearest]
+
+    def save(self, path: str = CENTROIDS_FILE):
+        data = {
+            "band_box": RARITY_BOX,
+            "band_size": BAND_SIZE,
+            "labels": self.labels,
+            "centroids": self.centroids.round(3).tolist(),
+            "scale": self.scale.round(3).tolist(),
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str = CENTROIDS_FILE) -> "RarityClassifier":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["labels"], data["centroids"], data["scale"])
+
+
+_classifier = None
+
+
+def load_classifier(path: str = CENTROIDS_FILE) -> RarityClassifier | None:
+    """The fitted classifier, loaded once, or None if rarity-fit hasn't been run"""
+    global _classifier
+    if _classifier is None and os.path.exists(path):
+        _classifier = RarityClassifier.load(path)
+    return _classifier
+
+
+def detect_rarities(bands) -> list[str]:
+    """Rarity of every band in one pass, with the fitted centroids if there are any"""
+    with span("rarity", cards=len(bands)):
+        classifier = load_classifier()
+        if classifier is None:
+            return threshold_rarities(bands)
+        return classifier.classify(bands)
+
+
+def fetch_band(card_id: str) -> np.ndarray | None:
+    import requests
+    import pillow_avif
+
+    set_key = card_id.split("-")[0]
+    url = f"https://cdn.rgpub.io/public/live/map/riftbound/latest/{set_key}/cards/{card_id}/full-desktop-2x.avif"
+    try:
+        response = requests.get(url, timeout=10)
+        if response.status_code != 200:
+            print(f"✘ Not found: {card_id} (HTTP {response.status_code})")
+            return None
+        with Image.open(BytesIO(response.content)) as image:
+            return rarity_band(image.convert("RGB"))
+    except Exception as e:
+        print(f"✘ Error downloading {card_id}: {e}")
+        return None
+
+
+def load_bands(card_ids: list[str], refresh: bool = False, workers: int = FIT_WORKERS) -> dict[str, np.ndarray]:
+    """Bands of the given cards, downloading only those not in BANDS_CACHE"""
+    cached = {}
+    if not refresh and os.path.exists(BANDS_CACHE):
+        with np.load(BANDS_CACHE) as data:
+            cached = dict(zip(data["ids"].tolist(), data["bands"]))
+        cached = {card_id: band for card_id, band in cached.items() if band.shape[:2] == BAND_SIZE[::-1]}
+
+    missing = [card_id for card_id in card_ids if card_id not in cached]
+    if missing:
+        print(f"Downloading {len(missing)} cards")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for card_id, band in zip(missing, pool.map(fetch_band, missing)):
+                if band is not None:
+                    cached[card_id] = band
+        ids = sorted(cached)
+        np.savez(BANDS_CACHE, ids=np.array(ids), bands=np.stack([cached[card_id] for card_id in ids]))
+    return {card_id: cached[card_id] for card_id in card_ids if card_id in cached}
+
+
+def fit_rarity(catalogs=FIT_CATALOGS, path: str = CENTROIDS_FILE, refresh: bool = False) -> RarityClassifier:
+    """Fit centroids from every labelled card of the catalogs, save them and report accuracy"""
+    labels = {}
+    for catalog in catalogs:
+        try:
+            entries = load_catalog(catalog)
+        except FileNotFoundError:
+            print(f"⚠️  No catalog at {catalog}, skipped")
+            continue
+        labels.update((entry["id"], entry["rarity"]) for entry in entries if entry.get("rarity"))
+
+    bands = load_bands(list(labels), refresh=refresh)
+    if not bands:
+        raise ValueError("No labelled cards to fit rarity centroids from")
+    card_ids = list(bands)
+    stacked = np.stack([bands[card_id] for card_id in card_ids])
+    truth = [labels[card_id] for card_id in card_ids]
+
+    classifier = RarityClassifier.fit(stacked, truth)
+    classifier.save(path)
+    global _classifier
+    _classifier = classifier
+
+    predicted = classifier.classify(stacked)
+    wrong = [(card_id, want, got) for card_id, want, got in zip(card_ids, truth, predicted) if want != got]
+    for card_id, want, got in wrong:
+        print(f"  {card_id}: labelled {want}, classified {got}")
+    print(f"🎯 Fit {len(classifier.labels)} rarity centroids on {len(card_ids)} cards to {path},"
+          f" {len(card_ids) - len(wrong)}/{len(card_ids)} classified as labelled")
+    return classifier
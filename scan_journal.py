@@ -0,0 +1,96 @@
+"""Crash-safe progress for long OCR scans.
+
+A scan appends each card's result to a JSONL journal the moment the card is
+done, flushed to disk. Every COMPACT_EVERY cards, and when the scan ends,
+the journal is merged into the json5 catalog, which is replaced atomically.
+If a full scan crashes or is stopped, the next full scan reads the journal
+and skips the cards already in it. The journal is deleted once a scan
+finishes, unless it belongs to an interrupted full scan that a scan of a
+few cards added to.
+"""
+import json
+import os
+
+from catalog import load_catalog, save_catalog
+
+COMPACT_EVERY = 25  # cards between merges into the catalog
+
+
+def card_sort_key(entry: dict) -> int:
+    # Extract numeric part from "OGN-001" -> 1
+    return int(entry["id"].split("-")[1])
+
+
+def merge_results(catalog_path: str, results: list[dict]):
+    """Add or overwrite results in a catalog by ID, keeping it sorted"""
+    try:
+        existing = {entry["id"]: entry for entry in load_catalog(catalog_path)}
+    except FileNotFoundError:
+        existing = {}
+    for result in results:
+        existing[result["id"]] = result
+    save_catalog(catalog_path, sorted(existing.values(), key=card_sort_key))
+
+
+class ScanJournal:
+    """Results of the scan in progress, one JSON object per line"""
+
+    def __init__(self, path: str, catalog_path: str, compact_every: int = COMPACT_EVERY):
+        self.path = path
+        self.catalog_path = catalog_path
+        self.compact_every = compact_every
+        self.results = {}
+        self._since_compact = 0
+
+    def exists(self) -> bool:
+        """Whether an interrupted scan left its journal"""
+        return os.path.exists(self.path)
+
+    def load(self) -> dict[str, dict]:
+        """Results of an interrupted scan by card ID, a torn last line is ignored"""
+        self.results = {}
+        try:
+            with open(self.path, "rb+") as f:
+                good = 0
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The write in progress when the scan died, cut it so appends start on a fresh line
+                        f.truncate(good)
+                        break
+                    self.results[result["id"]] = result
+                    good += len(line)
+        except FileNotFoundError:
+            pass
+        return self.results
+
+    def reset(self) -> dict[str, dict]:
+        """Forget an interrupted scan and start afresh"""
+        self.results = {}
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return self.results
+
+    def append(self, result: dict):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.results[result["id"]] = result
+        self._since_compact += 1
+        if self._since_compact >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Merge everything journaled so far into the catalog"""
+        if self.results:
+            merge_results(self.catalog_path, list(self.results.values()))
+        self._since_compact = 0
+
+    def finish(self):
+        """Merge the finished scan into the catalog and drop the journal"""
+        self.compact()
+        self.reset()
@@ -0,0 +1,110 @@
+"""The OCR fast path against full detection.
+
+The fallback rules run against a fake reader. The comparison on real crops
+uses the samples saved by `python cli.py ocr-fit`, together with the line
+boxes in ocr_line_boxes.json, and is skipped until it has run, or when
+easyocr isn't installed.
+"""
+import glob
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import ocr_service
+from ocr_service import LocalOCR, _plain, load_line_boxes, load_reader, words
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = sorted(glob.glob(os.path.join(REPO_DIR, ocr_service.SAMPLES_DIR, "*.png")))
+CROP = np.zeros((100, 400, 3), dtype=np.uint8)
+BOXES = {"rules": [(0.0, 1.0, 0.0, 0.5), (0.0, 1.0, 0.5, 1.0)]}
+
+
+class FakeReader:
+    """Stands in for easyocr.Reader: recognize() reads the given lines, readtext() is full detection"""
+
+    def __init__(self, lines, detected=(("full", 0.9),)):
+        self.lines = lines  # (text, confidence) per line box
+        self.detected = detected
+        self.recognized = 0
+        self.detections = 0
+
+    def recognize(self, crop, horizontal_list, free_list):
+        self.recognized += 1
+        assert free_list == [] and len(horizontal_list) == len(self.lines)
+        return [([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, confidence)
+                for (x0, x1, y0, y1), (text, confidence) in zip(horizontal_list, self.lines)]
+
+    def readtext(self, crop):
+        self.detections += 1
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], text, confidence) for text, confidence in self.detected]
+
+
+def read(monkeypatch, reader, boxes=BOXES, region="rules", **kwargs):
+    """Text read from CROP as region, and the engine's fast/full counts"""
+    monkeypatch.setattr(ocr_service, "load_reader", lambda: reader)
+    monkeypatch.setattr(ocr_service, "load_line_boxes", lambda: boxes)
+    engine = LocalOCR(**kwargs)
+    results = engine.readtext([CROP], [region])[0]
+    return [text for _, text, _ in results], engine.stats
+
+
+def test_no_line_boxes_before_fit(tmp_path):
+    assert load_line_boxes(str(tmp_path / "ocr_line_boxes.json")) == {}
+
+
+def test_confident_lines_skip_detection(monkeypatch):
+    reader = FakeReader([("Unit", 0.9), ("Draw 1", 0.8)])
+    texts, stats = read(monkeypatch, reader, fast_path=True)
+    assert texts == ["Unit", "Draw 1"]
+    assert stats == {"fast": 1, "full": 0} and reader.detections == 0
+
+
+@pytest.mark.parametrize("lines", [
+    [("Unit", 0.9), ("Draw 1", ocr_service.FAST_MIN_CONFIDENCE - 0.01)],  # one unsure line
+    [(" ", 0.9), ("", 0.9)],  # nothing read
+], ids=["low_confidence", "empty"])
+def test_unsure_fast_read_falls_back_to_detection(monkeypatch, lines):
+    reader = FakeReader(lines)
+    texts, stats = read(monkeypatch, reader, fast_path=True)
+    assert texts == ["full"]
+    assert stats == {"fast": 0, "full": 1} and reader.recognized == 1
+
+
+@pytest.mark.parametrize("boxes, region, fast_path", [
+    ({}, "rules", True),  # ocr-fit hasn't run
+    ({"rules": []}, "rules", True),  # ocr-fit left the region to full detection
+    (BOXES, "type", True),  # no boxes for this region
+    (BOXES, "rules", False),  # fast path turned off
+], ids=["no_fit", "unfitted_region", "other_region", "disabled"])
+def test_full_detection_without_usable_boxes(monkeypatch, boxes, region, fast_path):
+    reader = FakeReader([("Unit", 0.9), ("Draw 1", 0.9)])
+    texts, stats = read(monkeypatch, reader, boxes, region, fast_path=fast_path)
+    assert texts == ["full"]
+    assert stats == {"fast": 0, "full": 1} and reader.recognized == 0
+
+
+def test_words_ignore_order_case_and_unsure_text():
+    fast = [(None, "Draw 1", 0.9), (None, "UNIT", 0.9)]
+    full = [(None, "unit draw", 0.9), (None, "1", 0.7), (None, "noise", 0.1)]
+    assert words(fast) == words(full)
+
+
+@pytest.mark.skipif(not SAMPLES, reason="no sample crops, run `python cli.py ocr-fit` first")
+@pytest.mark.parametrize("path", SAMPLES, ids=lambda path: os.path.basename(path)[:-len(".png")])
+def test_fast_path_reads_like_full_detection(path, monkeypatch):
+    pytest.importorskip("easyocr")
+    monkeypatch.chdir(REPO_DIR)
+    region = os.path.basename(path)[:-len(".png")]
+    boxes = load_line_boxes(os.path.join(REPO_DIR, ocr_service.LINE_BOXES_FILE)).get(region)
+    if not boxes:
+        pytest.skip(f"{region} has no fitted line boxes")
+
+    crop = np.array(Image.open(path).convert("RGB"))
+    reader = load_reader()
+    fast = LocalOCR()._recognize(reader, crop, boxes)
+    full = [_plain(detection) for detection in reader.readtext(crop)]
+
+    assert fast is not None, "a line read below FAST_MIN_CONFIDENCE"
+    assert words(fast) == words(full)
@@ -0,0 +1,162 @@
+"""Lightweight span tracing for renders and scans.
+
+Off by default, and a disabled span is a single flag check. Turn it on
+with enable() or by setting CARD_TRACE=<path> in the environment, in which
+case a Chrome/Perfetto trace is written to <path> and a per-stage summary
+is printed when the process exits. Open the trace at https://ui.perfetto.dev.
+"""
+import atexit
+import functools
+import json
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+
+ENABLED = False
+TRACE_MEMORY = False
+
+_events = []
+_thread_names = {}
+_start_ns = time.perf_counter_ns()
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        if TRACE_MEMORY:
+            # Peaks are per span; when spans nest or overlap across threads
+            # the numbers are only indicative
+            tracemalloc.reset_peak()
+            self.mem_start = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        event = {
+            "name": self.name,
+            "cat": self.name.split(".")[0],
+            "ph": "X",
+            "ts": (self.start - _start_ns) / 1000,
+            "dur": (end - self.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        args = dict(self.args)
+        if TRACE_MEMORY:
+            args["peak_kib"] = round((tracemalloc.get_traced_memory()[1] - self.mem_start) / 1024, 1)
+        if args:
+            event["args"] = args
+        _thread_names.setdefault(event["tid"], threading.current_thread().name)
+        _events.append(event)  # list.append is atomic, no lock needed
+        return False
+
+
+def span(name: str, **args):
+    """Time a block: `with span("resize", card=card_id): ...`"""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name, args)
+
+
+def traced(name: str):
+    """Decorator version of span()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not ENABLED:
+                return fn(*a, **kw)
+            with _Span(name, {}):
+                return fn(*a, **kw)
+        return wrapper
+    return decorator
+
+
+def enable(trace_memory: bool = True):
+    global ENABLED, TRACE_MEMORY
+    ENABLED = True
+    TRACE_MEMORY = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global ENABLED, TRACE_MEMORY
+    ENABLED = False
+    if TRACE_MEMORY and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    TRACE_MEMORY = False
+
+
+def reset():
+    _events.clear()
+    _thread_names.clear()
+
+
+def export_chrome_trace(path: str):
+    """Write the recorded spans in Chrome trace event format"""
+    pid = os.getpid()
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in _thread_names.items()
+    ]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": metadata + list(_events), "displayTimeUnit": "ms"}, f)
+    print(f"🧭 Wrote trace with {len(_events)} spans to {path}")
+
+
+def summary() -> list[dict]:
+    """Per-stage totals, slowest stage first"""
+    by_name = {}
+    for event in list(_events):
+        by_name.setdefault(event["name"], []).append(event)
+
+    rows = []
+    for name, events in by_name.items():
+        durations = sorted(event["dur"] / 1000 for event in events)
+        peaks = [event.get("args", {}).get("peak_kib", 0) for event in events]
+        rows.append({
+            "stage": name,
+            "count": len(durations),
+            "total_ms": sum(durations),
+            "mean_ms": statistics.fmean(durations),
+            "p95_ms": durations[min(len(durations) - 1, round(0.95 * (len(durations) - 1)))],
+            "max_ms": durations[-1],
+            "peak_kib": max(peaks),
+        })
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def print_summary():
+    rows = summary()
+    if not rows:
+        return
+    print(f"\n{'stage':32} {'count':>6} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'peak KiB':>10}")
+    for row in rows:
+        print(f"{row['stage']:32} {row['count']:6d} {row['total_ms']:10.1f} {row['mean_ms']:9.2f} {row['p95_ms']:9.2f} {row['max_ms']:9.2f} {row['peak_kib']:10.1f}")
+
+
+def _export_at_exit(path: str):
+    export_chrome_trace(path)
+    print_summary()
+
+
+if os.environ.get("CARD_TRACE"):
+    enable(trace_memory=os.environ.get("CARD_TRACE_MEMORY", "1") != "0")
+    atexit.register(_export_at_exit, os.environ["CARD_TRACE"])